@@ -0,0 +1,115 @@
+"""Home, away and recent form tables, all computed from one sorted pass over the results"""
+
+import numpy as np
+import pandas as pd
+
+FORM_GAMES = 5
+
+# column: dtype, shared by every table
+TABLE_COLUMNS = {
+    'position': 'int64',
+    'id': 'int64',
+    'name': 'string',
+    'short_name': 'string',
+    'played': 'int64',
+    'won': 'int64',
+    'drawn': 'int64',
+    'lost': 'int64',
+    'goals_for': 'int64',
+    'goals_against': 'int64',
+    'goal_difference': 'int64',
+    'points': 'int64',
+    'points_per_game': 'float64',
+    # results oldest to newest, e.g. 'WDLWW'
+    'results': 'string',
+}
+
+STATS = ['played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'points']
+
+
+def team_results(df2):
+    """
+    One row per team per finished fixture, from that team's point of view,
+    sorted by team and then kickoff
+    """
+    finished = df2[
+        (df2['status'] != 'CANCELLED')
+        & df2['team_h_score'].notnull()
+        & df2['team_a_score'].notnull()
+    ]
+    kickoff = pd.to_datetime(finished['kickoff_time'], utc=True, errors='coerce')
+    home_score = finished['team_h_score'].astype(int).to_numpy()
+    away_score = finished['team_a_score'].astype(int).to_numpy()
+
+    results = pd.DataFrame({
+        'id': np.concatenate([finished['team_h'], finished['team_a']]),
+        'kickoff': np.concatenate([kickoff, kickoff]),
+        'fixture_id': np.concatenate([finished['fixture_id'], finished['fixture_id']]),
+        'home': np.repeat([True, False], len(finished.index)),
+        'goals_for': np.concatenate([home_score, away_score]),
+        'goals_against': np.concatenate([away_score, home_score]),
+    })
+    results['played'] = 1
+    results['won'] = (results['goals_for'] > results['goals_against']).astype(int)
+    results['drawn'] = (results['goals_for'] == results['goals_against']).astype(int)
+    results['lost'] = (results['goals_for'] < results['goals_against']).astype(int)
+    results['points'] = 3 * results['won'] + results['drawn']
+    results['result'] = np.select([results['won'] == 1, results['drawn'] == 1], ['W', 'D'], 'L')
+
+    # the only sort: every table below is a mask over this order
+    return results.sort_values(['id', 'kickoff', 'fixture_id'],
+                               na_position='first', ignore_index=True)
+
+
+def compute_form_tables(teams, df2, form_games=FORM_GAMES):
+    """
+    Home only, away only and last 'form_games' form tables, for every team in 'teams'.\n
+    Each result is counted once per table it belongs to, then every table is totalled
+    in a single groupby. Points deductions are not applied.\n
+    Returns {'home': frame, 'away': frame, 'form': frame}, each ranked by points,
+    goal difference and goals scored, with the columns and dtypes in TABLE_COLUMNS.
+    """
+    results = team_results(df2)
+
+    # games counted back from each team's latest result, 0 being the latest
+    from_latest = results.groupby('id').cumcount(ascending=False)
+    masks = {
+        'home': results['home'],
+        'away': ~results['home'],
+        'form': from_latest < form_games,
+    }
+
+    totals = pd.DataFrame({'id': results['id']})
+    for table, mask in masks.items():
+        for stat in STATS:
+            totals[f'{table}_{stat}'] = results[stat].where(mask, 0)
+        totals[f'{table}_results'] = results['result'].where(mask, '')
+    totals = totals.groupby('id').sum()
+
+    # PL teams have a 'name' column, ELC teams keep the API's 'team.name'
+    name_column = 'name' if 'name' in teams.columns else 'team.name'
+    index = pd.Index(teams['id'], name='id')
+    totals = totals.reindex(index)
+
+    tables = {}
+    for table in masks:
+        frame = pd.DataFrame({
+            'id': teams['id'].to_numpy(),
+            'name': teams[name_column].to_numpy(),
+            'short_name': teams['short_name'].to_numpy(),
+        })
+        for stat in STATS:
+            frame[stat] = totals[f'{table}_{stat}'].fillna(0).to_numpy()
+        frame['results'] = totals[f'{table}_results'].fillna('').to_numpy()
+
+        frame['goal_difference'] = frame['goals_for'] - frame['goals_against']
+        frame['points_per_game'] = (
+            frame['points'] / frame['played'].where(frame['played'] > 0)
+        ).fillna(0).round(2)
+
+        frame = frame.sort_values(['points', 'goal_difference', 'goals_for'],
+                                  ascending=False, kind='stable', ignore_index=True)
+        frame['position'] = range(1, len(frame.index) + 1)
+        tables[table] = frame[list(TABLE_COLUMNS)].astype(TABLE_COLUMNS)
+
+    return tables
@@ -0,0 +1,267 @@
+"""Live match-day mode: poll only the fixtures in play, and update standings incrementally"""
+
+import json
+import os
+import time
+import pandas as pd
+import requests
+from dotenv import load_dotenv
+from .loaders import load_standings
+from .transformers import gen_additional_data, get_team_record, points_deductions
+
+# seconds between polls while a fixture is in play, within each API's courtesy limits
+LIVE_INTERVAL = {
+    'PL': 20,
+    'ELC': 30,   # football-data.org free tier allows 10 requests a minute
+}
+
+# slower polling once every live fixture has its provisional result
+SETTLING_INTERVAL = 300
+
+# stop live mode if the next kickoff is further away than this
+MATCH_WINDOW = pd.Timedelta(hours=12)
+
+# longer than any match lasts; a fixture this long after kickoff is treated as over,
+# whether it was never reported as started or never reported as finished
+KICKOFF_GRACE = pd.Timedelta(hours=3)
+
+# fixtures with these statuses will not be played at their scheduled kickoff
+INACTIVE_STATUSES = ['CANCELLED', 'POSTPONED', 'SUSPENDED']
+
+LIVE_COLUMNS = ['team_h_score', 'team_a_score', 'status', 'started',
+                'finished', 'finished_provisional', 'kickoff_time']
+
+
+def fetch_pl_fixtures(active):
+    """Fetch only the gameweeks of the active fixtures from the Fantasy PL API"""
+    base_url = 'https://fantasy.premierleague.com/api/'
+
+    fix = []
+    for event in sorted(active['event'].dropna().unique()):
+        fix += requests.get(base_url+f'fixtures/?event={int(event)}', timeout=10).json()
+
+    updates = pd.json_normalize(fix)
+    if updates.empty:
+        return updates
+
+    updates = updates.rename(columns={'id': 'fixture_id'})
+    updates['status'] = 'SCHEDULED'
+    updates.loc[updates['finished'], 'status'] = 'FINISHED'
+    updates.loc[
+        (updates['started']) & (~updates['finished']), 'status'
+    ] = 'IN_PLAY'
+
+    return updates
+
+
+def fetch_elc_fixtures(active):
+    """Fetch only the active fixtures, by id, from the football-data.org API"""
+    env_path = os.path.join(os.path.dirname(__file__), '..', 'utils', '.env')
+    load_dotenv(env_path)
+
+    url = 'https://api.football-data.org/v4/'
+    headers = { 'X-Auth-Token': os.getenv('FOOTBALL_DATA_KEY') }
+
+    ids = ','.join(str(int(fixture_id)) for fixture_id in active['fixture_id'])
+    raw_response = requests.get(url+f'matches?ids={ids}', headers=headers, timeout=10).json()
+
+    updates = pd.json_normalize(raw_response.get('matches', []))
+    if updates.empty:
+        return updates
+
+    updates = updates.rename(columns={'id': 'fixture_id',
+                                      'score.fullTime.home': 'team_h_score',
+                                      'score.fullTime.away': 'team_a_score',
+                                      'utcDate': 'kickoff_time'})
+    updates['finished'] = updates['status'] == 'FINISHED'
+    updates['finished_provisional'] = updates['finished']
+    updates['started'] = (
+        pd.to_datetime(updates['kickoff_time'], utc=True) < pd.Timestamp.now(tz='UTC')
+    )
+
+    return updates
+
+
+FETCHERS = {
+    "PL": fetch_pl_fixtures,
+    "ELC": fetch_elc_fixtures,
+}
+
+
+class LiveFeed():
+    """Polls the league API in real time, optionally recording each poll for later replay"""
+    def __init__(self, competition, record_path=None):
+        self.fetch_fixtures = FETCHERS[competition]
+        self.record_path = record_path
+
+    def now(self):
+        """Current time (UTC)"""
+        return pd.Timestamp.now(tz='UTC')
+
+    def sleep(self, seconds):
+        """Wait until the next poll"""
+        time.sleep(seconds)
+
+    def fetch(self, active):
+        """Fetch the latest data for the active fixtures"""
+        updates = self.fetch_fixtures(active)
+        if self.record_path and not updates.empty:
+            columns = ['fixture_id'] + [c for c in LIVE_COLUMNS if c in updates.columns]
+            snapshot = {'time': self.now().isoformat(),
+                        'fixtures': json.loads(updates[columns].to_json(orient='records'))}
+            with open(self.record_path, 'a', encoding='utf-8') as record:
+                record.write(json.dumps(snapshot) + '\n')
+        return updates
+
+
+class ReplayFeed():
+    """
+    Replays a match day recorded by LiveFeed, on a virtual clock.\n
+    Each line of the file is a snapshot: {"time": ISO timestamp, "fixtures": [...]}
+    """
+    def __init__(self, path, start=None):
+        with open(path, encoding='utf-8') as replay:
+            self.snapshots = [json.loads(line) for line in replay if line.strip()]
+        for snapshot in self.snapshots:
+            snapshot['time'] = pd.Timestamp(snapshot['time'])
+        self.clock = pd.Timestamp(start) if start is not None else self.snapshots[0]['time']
+        self.polls = 0
+
+    def now(self):
+        """Current time on the virtual clock"""
+        return self.clock
+
+    def sleep(self, seconds):
+        """Advance the virtual clock instead of waiting"""
+        self.clock += pd.Timedelta(seconds=seconds)
+
+    def fetch(self, active):
+        """Latest recorded snapshot at the current virtual time, for the active fixtures"""
+        self.polls += 1
+        recorded = [s for s in self.snapshots if s['time'] <= self.clock]
+        if not recorded or not recorded[-1]['fixtures']:
+            return pd.DataFrame()
+
+        updates = pd.DataFrame(recorded[-1]['fixtures'])
+        return updates[updates['fixture_id'].isin(active['fixture_id'])]
+
+
+def _kickoffs(df2):
+    return pd.to_datetime(df2['kickoff_time'], utc=True, errors='coerce')
+
+
+def active_fixtures(df2, now):
+    """Fixtures that have kicked off (or should have by now) but are not finished"""
+    kickoffs = _kickoffs(df2)
+    recent = kickoffs > now - KICKOFF_GRACE
+    due = (kickoffs <= now) & recent
+    # a fixture without a kickoff time can only be bounded by its own flags
+    started = (df2['started'].astype(bool) & (recent | kickoffs.isna())) | due
+    return df2[started & ~df2['finished'].astype(bool) & ~df2['status'].isin(INACTIVE_STATUSES)]
+
+
+def next_poll_delay(df2, now, competition):
+    """
+    Seconds to wait before the next poll, or None when live mode should stop.\n
+    Poll quickly while fixtures are in play, slowly while results settle, and
+    otherwise sleep until the next kickoff if it is within MATCH_WINDOW.
+    """
+    active = active_fixtures(df2, now)
+    if not active.empty:
+        if (~active['finished_provisional'].astype(bool)).any():
+            return LIVE_INTERVAL[competition]
+        return SETTLING_INTERVAL
+
+    kickoffs = _kickoffs(df2)
+    upcoming = kickoffs[(kickoffs > now) & ~df2['status'].isin(INACTIVE_STATUSES)]
+    if upcoming.empty or upcoming.min() - now > MATCH_WINDOW:
+        return None
+
+    return max(LIVE_INTERVAL[competition], (upcoming.min() - now).total_seconds())
+
+
+def apply_updates(df2, updates):
+    """
+    Write fetched values into the fixtures dataframe, in place.\n
+    Returns the set of team IDs whose fixtures changed.
+    """
+    if updates.empty:
+        return set()
+
+    columns = [c for c in LIVE_COLUMNS if c in updates.columns]
+    updates = updates.set_index('fixture_id')[columns]
+
+    changed_teams = set()
+    for row in df2[df2['fixture_id'].isin(updates.index)].itertuples():
+        new = updates.loc[row.fixture_id]
+        changed = [c for c in columns
+                   if not (pd.isna(new[c]) and pd.isna(getattr(row, c)))
+                   and new[c] != getattr(row, c)]
+        if changed:
+            df2.loc[row.Index, changed] = new[changed].values
+            changed_teams.update((row.team_h, row.team_a))
+
+    return changed_teams
+
+
+def update_standings(teams, df2, team_ids):
+    """
+    Recalculate the records of only the given teams, then re-sort.\n
+    'teams' must already have the columns added by gen_additional_data.
+    """
+    for team_id in team_ids:
+        points, max_pts, goal_difference, goals_for, _played = get_team_record(team_id, df2)
+        points, max_pts = points_deductions(team_id, points, max_pts)
+
+        teams.loc[teams.id == team_id, ['max_points', 'goal_difference', 'goals_for']] = [
+            max_pts, int(goal_difference), goals_for
+        ]
+
+    return teams.sort_values(by=['max_points', 'goal_difference', 'goals_for'],
+                             ascending=[False, False, False])
+
+
+def run_live(competition: str, render, pos_one=1, pos_two=20, feed=None, data=None):
+    """
+    Keep the table up to date during a match window.\n
+    render -- called with (teams, fixtures, team_crest) whenever the chart needs redrawing\n
+    feed -- LiveFeed (default) or ReplayFeed to poll\n
+    data -- already loaded (teams, fixtures, team_crest) to start from (default None)\n
+    The chart is only redrawn when a changed fixture involves a team shown between
+    pos_one and pos_two, before or after the update.
+    """
+    feed = feed or LiveFeed(competition)
+    teams, df2, team_crest = data if data is not None else load_standings(competition)
+    standings, _ = gen_additional_data(teams.copy(), df2)
+    renders = 0
+
+    render((teams, df2, team_crest))
+    renders += 1
+
+    while True:
+        delay = next_poll_delay(df2, feed.now(), competition)
+        if delay is None:
+            break
+        feed.sleep(delay)
+
+        active = active_fixtures(df2, feed.now())
+        if active.empty:
+            continue
+
+        poll_time = time.time()
+        changed_teams = apply_updates(df2, feed.fetch(active))
+        if not changed_teams:
+            continue
+
+        shown_before = set(standings['id'].iloc[pos_one - 1:pos_two])
+        standings = update_standings(standings, df2, changed_teams)
+        shown_after = set(standings['id'].iloc[pos_one - 1:pos_two])
+
+        if changed_teams & (shown_before | shown_after):
+            render((teams, df2, team_crest))
+            renders += 1
+            print(f'{feed.now()}: updated {len(changed_teams)} team(s) '
+                  f'in {round(time.time() - poll_time, 3)} sec.')
+
+    print(f'No fixtures in play or due to kick off. Live mode finished after {renders} render(s).')
+    return standings
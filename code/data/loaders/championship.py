@@ -6,7 +6,7 @@ from pathlib import Path
 import requests
 import pandas as pd
 from dotenv import load_dotenv
-from PIL import Image
+from .crests import load_crests, crest_colours
 
 def load_fixture_data():
     """
@@ -21,8 +21,6 @@ def load_fixture_data():
 
     football_data_api_key = os.getenv('FOOTBALL_DATA_KEY')
 
-    pd.set_option('future.no_silent_downcasting', True)
-
     url = 'https://api.football-data.org/v4/'
     headers = { 'X-Auth-Token': football_data_api_key }
 
@@ -40,6 +38,7 @@ def load_fixture_data():
                                         'utcDate': 'kickoff_time'
                                         })
     fixtures['finished'] = fixtures['status'] == 'FINISHED'
+    fixtures['fixture_id'] = fixtures['id']
 
     teams = requests.get(url+'competitions/ELC/standings', headers=headers, timeout=10).json()
     teams = pd.json_normalize(teams['standings'], 'table')
@@ -52,17 +51,9 @@ def load_fixture_data():
     teams.loc[teams.id==345, 'short_name'] = "SHW"
 
     # create dictionary of team crests
-    cur_dir = Path(__file__).resolve().parent
-    logo_dir = cur_dir / '..' / '..' / '..' / 'Logos' / 'ELC'
-
-    team_crest = {
-        row.id: Image.open(logo_dir / f"{row.id}.png").convert("RGBA")
-        for row in teams.itertuples()
-    }
+    team_crest = load_crests('ELC', teams['id'])
 
-    teams["colours"] = [
-        img.info.get("primary_color") for img in team_crest.values()
-    ]
+    teams["colours"] = crest_colours('ELC', team_crest)
 
     def get_start_time(row):
         fix_time = datetime.strptime(row, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
@@ -0,0 +1,70 @@
+"""Team crest images, and the colour/dimension manifest built from them"""
+
+import json
+from pathlib import Path
+import threading
+from PIL import Image
+
+LOGO_DIR = Path(__file__).resolve().parent.parent.parent.parent / 'Logos'
+MANIFEST_PATH = LOGO_DIR / 'manifest.json'
+
+# decoded crests shared by every load in this process, keyed by (league, team id).
+# The images are shared, so treat them as read-only
+_DECODED = {}
+_DECODE_LOCK = threading.Lock()
+
+
+def read_manifest():
+    """
+    Read the crest manifest written by utils/crest_manifest.py.\n
+    Returns an empty manifest if it has not been built yet.
+    """
+    if not MANIFEST_PATH.exists():
+        return {}
+
+    with open(MANIFEST_PATH, encoding='utf-8') as manifest_file:
+        return json.load(manifest_file)
+
+
+def preload_crests(league: str):
+    """
+    Decode every crest for the given league ahead of time, so load_crests only has to
+    look them up. Safe to run in a background thread while the league data is fetched.\n
+    Returns {team id: crest} for every crest in the league's folder.
+    """
+    with _DECODE_LOCK:
+        crests = {}
+        for path in sorted((LOGO_DIR / league).glob('*.png')):
+            key = (league, int(path.stem))
+            if key not in _DECODED:
+                _DECODED[key] = Image.open(path).convert("RGBA")
+            crests[key[1]] = _DECODED[key]
+        return crests
+
+
+def load_crests(league: str, team_ids):
+    """Create dictionary of team crests for the given league"""
+    logo_dir = LOGO_DIR / league
+
+    with _DECODE_LOCK:
+        for team_id in team_ids:
+            key = (league, int(team_id))
+            if key not in _DECODED:
+                _DECODED[key] = Image.open(logo_dir / f"{team_id}.png").convert("RGBA")
+
+        return {team_id: _DECODED[(league, int(team_id))] for team_id in team_ids}
+
+
+def crest_colours(league: str, team_crest: dict):
+    """
+    Primary colour for every crest in 'team_crest', in the same order.\n
+    Colours come from the manifest, falling back to the 'primary_color'
+    PNG text chunk for crests the manifest does not know about yet.
+    """
+    entries = read_manifest().get(league, {})
+
+    return [
+        entries[str(team_id)]['colour'] if str(team_id) in entries
+        else img.info.get("primary_color")
+        for team_id, img in team_crest.items()
+    ]
@@ -1,9 +1,8 @@
 """Load data from the external Premier League API"""
 
-from pathlib import Path
 import requests
 import pandas as pd
-from PIL import Image
+from .crests import load_crests, crest_colours
 
 def load_fixture_data():
     """
@@ -41,6 +40,9 @@ def load_fixture_data():
         right_on='id'
     )
 
+    # fixture id is suffixed by the team merges
+    df2['fixture_id'] = df2['id_x']
+
     df2['status'] = 'SCHEDULED'
     df2.loc[df2['finished'], 'status'] = 'FINISHED'
     df2.loc[
@@ -48,16 +50,8 @@ def load_fixture_data():
     ] = 'IN_PLAY'
 
     # create dictionary of team crests
-    cur_dir = Path(__file__).resolve().parent
-    logo_dir = cur_dir / '..' / '..' / '..' / 'Logos' / 'PL'
-
-    team_crest = {
-        row.id: Image.open(logo_dir / f"{row.id}.png").convert("RGBA")
-        for row in teams.itertuples()
-    }
+    team_crest = load_crests('PL', teams['id'])
 
-    teams["colours"] = [
-        img.info.get("primary_color") for img in team_crest.values()
-    ]
+    teams["colours"] = crest_colours('PL', team_crest)
 
     return teams, df2, team_crest
@@ -0,0 +1,245 @@
+"""Season standings held in arrays, updated one fixture at a time without rebuilding from the API"""
+
+from io import StringIO
+import json
+import numpy as np
+import pandas as pd
+from .loaders.crests import load_crests
+from .transformers import points_deductions
+
+SNAPSHOT_VERSION = 1
+
+# per-team totals, one array each
+TOTALS = ['played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'remaining']
+
+
+class SeasonState():
+    """
+    Per-team totals, remaining fixtures and table order for one competition.\n
+    Build with SeasonState.from_data(competition, (teams, fixtures, team_crest)) from the
+    loaders' output, or SeasonState.load(path) from a snapshot. Results follow the same
+    rules as transformers.get_team_record: a fixture counts once it has both scores and
+    is not cancelled, and stays remaining until it is finished.\n
+    apply_result, reschedule and void only touch the fixture and its two teams, then move
+    those two teams up or down the table as far as they need to go.
+    """
+    def __init__(self, competition, teams, df2):
+        self.competition = competition
+        self.teams = teams.reset_index(drop=True)
+        self.df2 = df2
+        self.team_row = {team_id: row for row, team_id in enumerate(self.teams['id'])}
+        self.fixture_row = {fixture_id: row for row, fixture_id in enumerate(df2['fixture_id'])}
+
+        # fixtures, by fixture row
+        self.home = df2['team_h'].map(self.team_row).to_numpy(dtype=np.intp)
+        self.away = df2['team_a'].map(self.team_row).to_numpy(dtype=np.intp)
+        self.home_score = pd.to_numeric(df2['team_h_score'], errors='coerce').to_numpy(
+            dtype=float, copy=True)
+        self.away_score = pd.to_numeric(df2['team_a_score'], errors='coerce').to_numpy(
+            dtype=float, copy=True)
+        self.status = df2['status'].to_numpy(dtype=object, copy=True)
+        self.kickoff = df2['kickoff_time'].to_numpy(dtype=object, copy=True)
+        self.started = df2['started'].astype(bool).to_numpy(copy=True)
+
+        # teams, by team row
+        count = len(self.teams.index)
+        self.totals = {total: np.zeros(count, dtype=np.int64) for total in TOTALS}
+        self.remaining_fixtures = [set() for _ in range(count)]
+        deductions = [points_deductions(team_id, 0, 0) for team_id in self.teams['id']]
+        self.points_deduction = np.array([pts for pts, _max in deductions], dtype=np.int64)
+        self.max_points_deduction = np.array([max_pts for _pts, max_pts in deductions],
+                                             dtype=np.int64)
+
+        # fixture rows changed since df2 was last brought up to date
+        self._dirty = set()
+        self.order = []
+        self.position = np.zeros(count, dtype=np.intp)
+
+    @classmethod
+    def from_data(cls, competition, data):
+        """Build the state from the (teams, fixtures, team_crest) returned by load_standings"""
+        teams, df2, _team_crest = data
+        state = cls(competition, teams, df2.copy())
+        for fixture in range(len(df2.index)):
+            state._add(fixture, 1)
+
+        state.order = sorted(range(len(state.teams.index)), key=state._sort_key)
+        state.position[state.order] = np.arange(len(state.order))
+        return state
+
+    # --- totals
+
+    def points(self):
+        """Current points of every team, by team row"""
+        return 3 * self.totals['won'] + self.totals['drawn'] + self.points_deduction
+
+    def max_points(self):
+        """Highest possible points of every team, by team row"""
+        return (3 * (self.totals['won'] + self.totals['remaining'])
+                + self.totals['drawn'] + self.max_points_deduction)
+
+    def _sort_key(self, row):
+        """Same order as gen_additional_data: max points, goal difference, goals scored"""
+        totals = self.totals
+        max_points = (3 * (totals['won'][row] + totals['remaining'][row])
+                      + totals['drawn'][row] + self.max_points_deduction[row])
+        goal_difference = totals['goals_for'][row] - totals['goals_against'][row]
+        return (-max_points, -goal_difference, -totals['goals_for'][row], row)
+
+    def _counted(self, fixture):
+        return (self.status[fixture] != 'CANCELLED'
+                and not np.isnan(self.home_score[fixture])
+                and not np.isnan(self.away_score[fixture]))
+
+    def _add(self, fixture, sign):
+        """Add (sign 1) or remove (sign -1) a fixture's contribution to both teams' totals"""
+        home, away = self.home[fixture], self.away[fixture]
+
+        if self._counted(fixture):
+            home_goals, away_goals = int(self.home_score[fixture]), int(self.away_score[fixture])
+            for team, scored, conceded in ((home, home_goals, away_goals),
+                                           (away, away_goals, home_goals)):
+                self.totals['played'][team] += sign
+                self.totals['goals_for'][team] += sign * scored
+                self.totals['goals_against'][team] += sign * conceded
+                result = 'won' if scored > conceded else 'drawn' if scored == conceded else 'lost'
+                self.totals[result][team] += sign
+
+        if self.status[fixture] != 'FINISHED':
+            for team in (home, away):
+                self.totals['remaining'][team] += sign
+                if sign > 0:
+                    self.remaining_fixtures[team].add(fixture)
+                else:
+                    self.remaining_fixtures[team].discard(fixture)
+
+    def _rerank(self, row):
+        """Move a team up or down the table until it is in order with its neighbours"""
+        pos = self.position[row]
+        key = self._sort_key(row)
+
+        while pos > 0 and key < self._sort_key(self.order[pos - 1]):
+            self.order[pos] = self.order[pos - 1]
+            self.position[self.order[pos]] = pos
+            pos -= 1
+        while pos < len(self.order) - 1 and key > self._sort_key(self.order[pos + 1]):
+            self.order[pos] = self.order[pos + 1]
+            self.position[self.order[pos]] = pos
+            pos += 1
+
+        self.order[pos] = row
+        self.position[row] = pos
+
+    def _update(self, fixture_id, **changes):
+        """Take a fixture out of the totals, change it, put it back and re-rank its teams"""
+        fixture = self.fixture_row[fixture_id]
+        self._add(fixture, -1)
+        for field, value in changes.items():
+            getattr(self, field)[fixture] = value
+        self._add(fixture, 1)
+
+        self._dirty.add(fixture)
+
+        # the home team is moved again once the away team is in place, as the away team
+        # may have blocked it on the first pass
+        self._rerank(self.home[fixture])
+        self._rerank(self.away[fixture])
+        self._rerank(self.home[fixture])
+
+    # --- updates
+
+    def apply_result(self, fixture_id, home, away, status='FINISHED'):
+        """Set a fixture's score. Use status='IN_PLAY' for a score that may still change."""
+        self._update(fixture_id, home_score=float(home), away_score=float(away), status=status,
+                     started=True)
+
+    def reschedule(self, fixture_id, kickoff):
+        """
+        Move a fixture to a new kickoff ('%Y-%m-%dT%H:%M:%SZ', or None if not yet known),
+        putting it back in the schedule if it was cancelled or postponed. Any score from
+        an abandoned attempt is cleared, as the fixture will be played again from the start.
+        """
+        if self.status[self.fixture_row[fixture_id]] == 'FINISHED':
+            raise ValueError(f"Fixture {fixture_id} is finished and can't be rescheduled")
+        self._update(fixture_id, kickoff=kickoff, status='SCHEDULED', started=False,
+                     home_score=np.nan, away_score=np.nan)
+
+    def void(self, fixture_id):
+        """Strike a fixture's result, leaving it to be played again as a cancelled fixture"""
+        self._update(fixture_id, home_score=np.nan, away_score=np.nan, status='CANCELLED',
+                     started=False)
+
+    # --- output
+
+    def standings(self):
+        """
+        The teams in table order, with the same points, max_points, goal_difference,
+        goals_for and played columns gen_additional_data adds
+        """
+        teams = self.teams.copy()
+        teams['points'] = self.points()
+        teams['max_points'] = self.max_points()
+        teams['goal_difference'] = self.totals['goals_for'] - self.totals['goals_against']
+        teams['goals_for'] = self.totals['goals_for']
+        teams['played'] = self.totals['played']
+        return teams.iloc[self.order]
+
+    def fixtures(self):
+        """The fixtures dataframe, with every update applied"""
+        if self._dirty:
+            rows = sorted(self._dirty)
+            index = self.df2.index[rows]
+            self.df2.loc[index, 'team_h_score'] = self.home_score[rows]
+            self.df2.loc[index, 'team_a_score'] = self.away_score[rows]
+            self.df2.loc[index, 'status'] = self.status[rows]
+            self.df2.loc[index, 'kickoff_time'] = self.kickoff[rows]
+            self.df2.loc[index, 'started'] = self.started[rows]
+            finished = self.status[rows] == 'FINISHED'
+            self.df2.loc[index, 'finished'] = finished
+            self.df2.loc[index, 'finished_provisional'] = finished
+            self._dirty.clear()
+        return self.df2
+
+    def data(self, team_crest=None):
+        """(teams, fixtures, team_crest), as load_standings returns them"""
+        if team_crest is None:
+            team_crest = load_crests(self.competition, self.teams['id'])
+        return self.teams.copy(), self.fixtures().copy(), team_crest
+
+    # --- snapshots
+
+    def save(self, path):
+        """Write the state to a JSON file that SeasonState.load can start from"""
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'competition': self.competition,
+            'teams': self.teams.to_json(orient='split'),
+            'fixtures': self.fixtures().to_json(orient='split'),
+            'totals': {total: values.tolist() for total, values in self.totals.items()},
+            'remaining_fixtures': [sorted(int(f) for f in fixtures)
+                                   for fixtures in self.remaining_fixtures],
+            'order': [int(row) for row in self.order],
+        }
+        with open(path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+
+    @classmethod
+    def load(cls, path):
+        """Restore a state written by save, without recounting any fixtures"""
+        with open(path, encoding='utf-8') as snapshot_file:
+            snapshot = json.load(snapshot_file)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+
+        def read_frame(text):
+            return pd.read_json(StringIO(text), orient='split', dtype=False,
+                                convert_dates=False, keep_default_dates=False)
+
+        state = cls(snapshot['competition'], read_frame(snapshot['teams']),
+                    read_frame(snapshot['fixtures']))
+        state.totals = {total: np.array(values, dtype=np.int64)
+                        for total, values in snapshot['totals'].items()}
+        state.remaining_fixtures = [set(fixtures) for fixtures in snapshot['remaining_fixtures']]
+        state.order = snapshot['order']
+        state.position[state.order] = np.arange(len(state.order))
+        return state
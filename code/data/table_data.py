@@ -0,0 +1,129 @@
+"""Compute the table as data (standings, remaining fixtures and threshold lines), without plotting"""
+
+from importlib.util import find_spec
+import json
+import os
+import pandas as pd
+from .loaders import load_standings
+from .transformers import gen_additional_data, get_remaining_fixtures, threshold_points
+from .form_tables import compute_form_tables, FORM_GAMES
+
+FORMATS = ['json', 'csv', 'arrow']
+
+# arrow needs pyarrow, which isn't a requirement, so it's only written when asked for
+DEFAULT_FORMATS = ['json', 'csv']
+
+
+def check_formats(formats):
+    """
+    Raise ValueError for any format not in FORMATS, and ImportError if arrow is asked
+    for without pyarrow installed, before any file is written
+    """
+    unknown = [data_format for data_format in formats if data_format not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown data format(s): {', '.join(unknown)}. "
+                         f"Choose from: {', '.join(FORMATS)}")
+    if 'arrow' in formats and find_spec('pyarrow') is None:
+        raise ImportError("The arrow format needs pyarrow, which is not installed "
+                          "(pip install pyarrow)")
+
+
+def compute_table(competition: str, lines_to_generate: list, pos_one=1, pos_two=20, data=None,
+                  form_games=FORM_GAMES):
+    """
+    Compute everything shown on the table image, as dataframes.\n
+    Takes the same competition, lines and positions as table_gen.generate_table,
+    and optionally already loaded (teams, fixtures, team_crest) data.\n
+    Returns a dictionary of dataframes:\n
+        standings -- one row per shown team: points, max points, GD, GF, MP, remaining\n
+        fixtures -- remaining fixtures per team, in the order they are drawn\n
+        thresholds -- points required for each threshold line\n
+        home, away, form -- home only, away only and last 'form_games' tables of
+        every team in the league, with points per game
+    """
+    teams, df2, _team_crest = data if data is not None else load_standings(competition)
+    form_tables = compute_form_tables(teams, df2, form_games)
+    teams, teams_all = gen_additional_data(teams, df2)
+    teams = teams.iloc[pos_one - 1:pos_two]
+
+    # PL teams have a 'name' column, ELC teams keep the API's 'team.name'
+    name_column = 'name' if 'name' in teams.columns else 'team.name'
+
+    standings = []
+    fixtures = []
+    for position, (team, name) in enumerate(zip(teams.itertuples(), teams[name_column]),
+                                            start=pos_one):
+        remaining = get_remaining_fixtures(team.id, df2)
+        remaining.insert(0, 'team_id', team.id)
+        remaining.insert(1, 'order', range(1, len(remaining.index) + 1))
+        fixtures.append(remaining)
+
+        standings.append({
+            'position': position,
+            'id': team.id,
+            'name': name,
+            'short_name': team.short_name,
+            'colour': team.colours,
+            'points': team.points,
+            'max_points': team.max_points,
+            'goal_difference': team.goal_difference,
+            'goals_for': int(team.goals_for),
+            'played': team.played,
+            'remaining': len(remaining.index),
+        })
+
+    thresholds = []
+    for position, label, colour in lines_to_generate:
+        pts_required = threshold_points(teams_all, position)
+        thresholds.append({
+            'position': position,
+            'label': label.replace('__', str(pts_required)),
+            'points_required': int(pts_required),
+            'colour': colour,
+            # the line is only drawn if a shown team maxes out at exactly this total
+            'shown': bool((teams['max_points'] == pts_required).any()),
+        })
+
+    fixtures = (pd.concat(fixtures, ignore_index=True) if fixtures
+                else pd.DataFrame(columns=['team_id', 'order']))
+    fixtures['opposition_difficulty'] = fixtures['opposition_difficulty'].astype(str)
+
+    return {
+        'standings': pd.DataFrame(standings),
+        'fixtures': fixtures,
+        'thresholds': pd.DataFrame(thresholds),
+        **form_tables,
+    }
+
+
+def write_table_data(tables: dict, base_folder, file_text, formats=None):
+    """
+    Write the dataframes from compute_table to 'base_folder'.\n
+    json -- one file containing every dataframe as a list of records\n
+    csv -- one file per dataframe\n
+    arrow -- one Arrow IPC (Feather) file per dataframe, requires pyarrow\n
+    'formats' defaults to DEFAULT_FORMATS. Returns the list of files written.
+    """
+    formats = formats or DEFAULT_FORMATS
+    check_formats(formats)
+    os.makedirs(base_folder, exist_ok=True)
+    written = []
+
+    if 'json' in formats:
+        path = os.path.join(base_folder, f'{file_text}.json')
+        with open(path, 'w', encoding='utf-8') as json_file:
+            json.dump({name: json.loads(frame.to_json(orient='records'))
+                       for name, frame in tables.items()}, json_file, indent=2)
+        written.append(path)
+
+    for name, frame in tables.items():
+        if 'csv' in formats:
+            path = os.path.join(base_folder, f'{file_text} {name}.csv')
+            frame.to_csv(path, index=False)
+            written.append(path)
+        if 'arrow' in formats:
+            path = os.path.join(base_folder, f'{file_text} {name}.arrow')
+            frame.reset_index(drop=True).to_feather(path)
+            written.append(path)
+
+    return written
@@ -3,6 +3,14 @@
 import numpy as np
 import pandas as pd
 
+def remaining_mask(team_id, df2):
+    """Boolean mask of the fixtures team 'team_id' still has to play (including cancelled)"""
+    return (
+        ((df2['status'] == 'CANCELLED') | (df2['status'] != 'FINISHED'))
+        & ((df2['team_h'] == team_id) | (df2['team_a'] == team_id))
+    )
+
+
 def get_team_record(team_id, df2):
     """Function to get teams record from their ID"""
     # team_name = teams.loc[teams.id == team_id, 'name'].values[0]
@@ -12,7 +20,11 @@ def get_team_record(team_id, df2):
     # record_df[['name_y','team_h_score', 'team_a_score', 'name_x']].head(11)
 
     w = d = l = gd = gf = 0
-    record_df = record_df.query("status != 'CANCELLED' and team_a_score.notnull() and team_h_score.notnull()")
+    record_df = record_df[
+        (record_df['status'] != 'CANCELLED')
+        & record_df['team_a_score'].notnull()
+        & record_df['team_h_score'].notnull()
+    ]
 
     for row in record_df.itertuples():
         score_for  = row.team_h_score if row.team_h == team_id else row.team_a_score
@@ -38,10 +50,7 @@ def get_team_record(team_id, df2):
         gd = str(gd)
 
     # fixture is in the future if it has not: Finished, Provisionally Finished, or Started
-    remaining_df = df2.query(
-            "(status == 'CANCELLED' or status != 'FINISHED') "
-            "and (team_h == @team_id or team_a == @team_id)"
-        ).reset_index()
+    remaining_df = df2[remaining_mask(team_id, df2)].reset_index()
 
     pts = int((w*3)+(d))
 
@@ -59,10 +68,7 @@ def get_team_record(team_id, df2):
 def get_remaining_fixtures(team_id, df2):
     """Takes a team ID and returns a pandas dataframe of remaining fixtures."""
 
-    filtered_df = df2.query(
-        "(status == 'CANCELLED' or status != 'FINISHED') "
-        "and (team_h == @team_id or team_a == @team_id)"
-    ).reset_index()
+    filtered_df = df2[remaining_mask(team_id, df2)].reset_index()
 
     #filtered_df[['name_y','team_h_score', 'team_a_score', 'name_x']]
 
@@ -133,23 +139,30 @@ def putfirst(df, i):
 
 def gen_additional_data(teams, df2):
     '''Generates additional data for each team'''
-    # add max points row, goal difference, and goals scored to dataframe (for H2H tiebreakers)
+    # add points, max points, goal difference, goals scored (for H2H tiebreakers)
+    # and matches played to dataframe
+    current_points = []
     max_points = []
     gd = []
     gf = []
+    played = []
     for team in teams.itertuples():
-        points, max_pts, goal_difference, goals_for, _played = get_team_record(team.id, df2)
+        points, max_pts, goal_difference, goals_for, games_played = get_team_record(team.id, df2)
 
         # Calculate points deductions for sorting purposes
         points, max_pts = points_deductions(team.id, points, max_pts)
 
+        current_points.append(points)
         max_points.append(max_pts)
         gd.append(int(goal_difference))
         gf.append(goals_for)
+        played.append(games_played)
 
+    teams['points'] = current_points
     teams['max_points'] = max_points
     teams['goal_difference'] = gd
     teams['goals_for'] = gf
+    teams['played'] = played
     teams = teams.sort_values(by=['max_points', 'goal_difference', 'goals_for'],
                             ascending=[False, False, False])
 
@@ -159,6 +172,11 @@ def gen_additional_data(teams, df2):
     return teams, teams_all
 
 
+def threshold_points(teams_all, position):
+    """Points needed to finish above a table position, 'teams_all' as sorted by gen_additional_data"""
+    return teams_all['max_points'].iloc[position]
+
+
 def points_deductions(row, points, max_pts):
     '''Calculate points deductions for the current team.
 
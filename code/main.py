@@ -1,7 +1,8 @@
 """Code that actually runs the table generation"""
 
+import argparse
+from datetime import datetime
 import sys
-from plotting import table_gen
 sys.dont_write_bytecode = True
 
 TITLE_PL = 'EPL: The race for European Competitions   '
@@ -23,5 +24,118 @@ lines_elc = [
     [21,"Above __ points for safety", '#e21a23']
 ]
 
-# table_gen.generate_table('ELC', lines_elc, TITLE_ELC, FILE_ELC, pos_one=1, pos_two=24)
-table_gen.generate_table('PL', lines_pl, TITLE_PL, FILE_PL, pos_one=1, pos_two=20)
+# competition: lines, title, file name, first position, last position
+TABLES = {
+    'PL': (lines_pl, TITLE_PL, FILE_PL, 1, 20),
+    'ELC': (lines_elc, TITLE_ELC, FILE_ELC, 1, 24),
+}
+
+
+def data_formats(value):
+    """argparse type for --data: a comma separated list of table_data.FORMATS"""
+    from data.table_data import check_formats  # pylint: disable=import-outside-toplevel
+
+    formats = value.split(',')
+    try:
+        check_formats(formats)
+    except (ValueError, ImportError) as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    return formats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the table visualization")
+    parser.add_argument('competition', nargs='?', default='PL', choices=TABLES.keys())
+    parser.add_argument('--data', metavar='FORMATS', type=data_formats,
+                        help="compute the table without plotting, and save it as a "
+                             "comma separated list of: json, csv, arrow (needs pyarrow)")
+    parser.add_argument('--workers', type=int,
+                        help="draw the team columns across this many processes; only "
+                             "faster on machines with many cores, and the column edges "
+                             "can differ by a pixel from the default serial drawing")
+    parser.add_argument('--band-mb', type=float,
+                        help="save the PNG in horizontal bands of at most this many MB, "
+                             "to keep the peak memory down on small runners")
+    parser.add_argument('--format', choices=['png', 'svg', 'html'], default='png',
+                        help="save the table as a PNG image, a compact SVG, or an "
+                             "HTML page with fixture details on hover")
+    parser.add_argument('--view', choices=['race', 'run-in'], default='race',
+                        help="the points race chart, or a grid of each team's remaining "
+                             "fixtures coloured by difficulty")
+    parser.add_argument('--sort', choices=['table', 'strength'], default='table',
+                        help="with --view run-in, order teams by the table or by the "
+                             "average difficulty of their remaining fixtures")
+    parser.add_argument('--draft', action='store_true',
+                        help="quick low resolution preview, for tuning the lines and titles")
+    parser.add_argument('--watch', action='store_true',
+                        help="with --draft, redraw the preview every time this file is saved")
+    parser.add_argument('--live', action='store_true',
+                        help="keep the table updated while fixtures are in play")
+    parser.add_argument('--replay', help="with --live, replay a recorded match day file")
+    parser.add_argument('--record', help="with --live, record every poll to this file")
+    args = parser.parse_args()
+
+    lines, title, file_text, pos_one, pos_two = TABLES[args.competition]
+
+    # only import what each mode needs, so --data never loads the plotting package
+    # pylint: disable=import-outside-toplevel
+    if args.data:
+        from data import table_data
+        from utils.utils import output_folder
+
+        tables = table_data.compute_table(args.competition, lines, pos_one, pos_two)
+        date_time = datetime.today().strftime('%d-%m-%y %H.%M')
+        written = table_data.write_table_data(tables, output_folder(args.competition),
+                                              f'{file_text} {date_time}', args.data)
+        print('\n'.join(written))
+    elif args.view == 'run-in':
+        from plotting import heatmap
+
+        print(heatmap.generate_heatmap(args.competition, lines, title, file_text,
+                                       pos_one, pos_two, sort=args.sort))
+    elif args.draft:
+        from data.loaders import load_standings
+        from plotting import table_gen
+
+        # records and columns only depend on the data, so they're worked out once
+        # and only the layout and drawing are redone as the config changes
+        prepared = table_gen.prepare_table(load_standings(args.competition))
+
+        def render_draft(config, fig=None):
+            """Draft of the table as configured in 'config', the variables of this file"""
+            import matplotlib.pyplot as plt
+
+            fig = fig or plt.figure()
+            print(table_gen.generate_table(args.competition, *config['TABLES'][args.competition],
+                                           prepared=prepared, workers=args.workers, draft=True,
+                                           fig=fig))
+            return fig
+
+        if args.watch:
+            from plotting.draft import watch_config
+
+            watch_config(__file__, render_draft)
+        else:
+            render_draft(globals())
+    elif args.format != 'png':
+        from plotting import svg_export
+
+        print(svg_export.export_svg(args.competition, lines, title, file_text,
+                                    pos_one, pos_two, html=args.format == 'html'))
+    elif args.live:
+        from data import live
+        from plotting import table_gen
+
+        feed = (live.ReplayFeed(args.replay) if args.replay
+                else live.LiveFeed(args.competition, record_path=args.record))
+        live.run_live(
+            args.competition,
+            lambda data: table_gen.generate_table(args.competition, lines, title, file_text,
+                                                  pos_one, pos_two, data=data,
+                                                  workers=args.workers, band_mb=args.band_mb),
+            pos_one, pos_two, feed=feed)
+    else:
+        from plotting import render_store
+
+        render_store.generate_table_cached(args.competition, lines, title, file_text,
+                                           pos_one=pos_one, pos_two=pos_two,
+                                           workers=args.workers, band_mb=args.band_mb)
@@ -0,0 +1,212 @@
+"""Draw each team's column of current points and remaining fixtures, serially or across processes"""
+
+from concurrent.futures import ProcessPoolExecutor
+import math
+import multiprocessing
+import threading
+from typing import NamedTuple
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+from .sprites import LabelSprites
+
+
+# worker pools kept for the life of the process, by worker count, so the workers only
+# import matplotlib once. Workers are spawned rather than forked, as generate_table may
+# be running in other threads, and forking a process with threads can deadlock the child.
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def column_pool(workers=None):
+    """The shared pool of 'workers' spawned processes (default: one per CPU)"""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+            _POOLS[workers] = pool
+        return pool
+
+
+class TeamColumn(NamedTuple):
+    """Everything needed to draw one team's column, independent of the rest of the chart"""
+    short_name: str
+    colour: str
+    points: int
+    goal_difference: str
+    games_played: str
+    # (difficulty colour, opposition id, location and date label) for each remaining fixture
+    fixtures: list
+
+
+def draw_team_column(ax, x, column, grey_crests, labels, barwidth, crests=None):
+    """
+    Draw a team's current points bar, with a box for every remaining fixture stacked on top.\n
+    If 'crests' is given, e.g. a draft.CrestOverlay, fixture crests are added to it
+    instead of each being drawn as its own image. Labels are left out if 'labels' is None.
+    """
+    # create bar for current points, with team colour
+    team_current_bar = ax.bar(x, column.points,
+                              color=column.colour, edgecolor=column.colour,
+                              width=barwidth
+                              )
+
+    # one box for every remaining fixture, stacked 3 points apart as each fixture
+    # has a possible value of 3 points, created in a single call
+    fixture_boxes = ax.bar(x, 3, bottom=column.points + 3 * np.arange(len(column.fixtures)),
+                           color=[colour for colour, _opp, _label in column.fixtures],
+                           edgecolor="#808080", lw=1.5, width=barwidth
+                           )
+
+    for current_fixture, (_c, opposition_id, location_date) in zip(fixture_boxes,
+                                                                   column.fixtures):
+        # positioning of image and text in upcoming fixture bar
+        bx, by = current_fixture.get_xy()
+        w, h = current_fixture.get_width(), current_fixture.get_height()
+
+        xleft = bx + w/8.5
+        xright = bx + w/1.121212
+        ybot = by + h/3.5
+        ytop = by + h/1.09
+
+        # plot the team logo and the fixture date
+        if crests is not None:
+            crests.add(grey_crests[opposition_id], [xleft, xright, ybot, ytop])
+        else:
+            ax.imshow(grey_crests[opposition_id], extent=[xleft, xright, ybot, ytop],
+                      aspect='auto', zorder=2)
+
+    # remove bottom box outline
+    bar_a = team_current_bar[0]
+    bx, by = bar_a.get_xy()
+    w, h = bar_a.get_width(), bar_a.get_height()
+    ax.bar(bx+w/2, color=bar_a.get_facecolor(),
+            lw=1.5, height=h+0.01, edgecolor=column.colour, width=barwidth)
+
+    if labels is not None:
+        add_column_labels(labels, bx+w/2, column)
+
+
+def add_column_labels(labels, centre, column):
+    """Add a column's fixture dates and its GD and MP labels to 'labels', centred on 'centre'"""
+    points = column.points
+
+    # fixture date, near the bottom of each fixture box
+    for index, (_c, _opp, location_date) in enumerate(column.fixtures):
+        labels.add(centre, points + 3 * index + 0.18, location_date, "#757171")
+
+    # goal difference label
+    gd_y = points-0.85 if points <2 else points-1
+    labels.add(centre, gd_y, column.goal_difference, 'white')
+
+    # matches played label
+    mp_y = points-0.35 if points <2 else points-0.5
+    labels.add(centre, mp_y, column.games_played, 'white')
+
+
+def render_column_strip(job):
+    """
+    Worker: draw one column on its own transparent canvas, covering the x range
+    [index - 0.5, index - 0.5 + width_px / px_per_unit] and the full y range of the chart.\n
+    Only the bars and crests are drawn: the labels go above the threshold lines, so the
+    main process draws them.
+    """
+    index, column, grey_crests, barwidth, ylim, width_px, height_px, px_per_unit, dpi = job
+
+    fig = Figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    fig.patch.set_alpha(0)
+
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_axis_off()
+    ax.set_xlim(index - 0.5, index - 0.5 + width_px / px_per_unit)
+    ax.set_ylim(*ylim)
+
+    draw_team_column(ax, index, column, grey_crests, None, barwidth)
+
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def draw_columns_parallel(ax, columns, grey_crests, barwidth, ylim, dpi, workers=None):
+    """
+    Rasterize every column's bars and crests in worker processes at 'dpi', then stitch
+    them into a single image on 'ax', pasting each strip as it arrives. The labels are
+    drawn as sprites in this process, over the threshold lines as in the serial path.\n
+    Workers come from a pool shared by every render, see column_pool.
+    The figure size, y limits and x margins must already be set.
+    """
+    # the x limits autoscaling would pick for the bars, with the axes' margins
+    data_left, data_right = -barwidth / 2, len(columns) - 1 + barwidth / 2
+    margin = ax.margins()[0] * (data_right - data_left)
+    xlim = (data_left - margin, data_right + margin)
+
+    fig_width, fig_height = ax.figure.get_size_inches()
+    position = ax.get_position()
+    width_px = round(position.width * fig_width * dpi)
+    height_px = round(position.height * fig_height * dpi)
+    px_per_unit = width_px / (xlim[1] - xlim[0])
+    strip_px = math.ceil(px_per_unit)
+
+    jobs = [
+        (index, column, {opp: grey_crests[opp] for _c, opp, _l in column.fixtures},
+         barwidth, ylim, strip_px, height_px, px_per_unit, dpi)
+        for index, column in enumerate(columns)
+    ]
+    stitched = np.zeros((height_px, width_px, 4), dtype=np.uint8)
+    for index, strip in enumerate(column_pool(workers).map(render_column_strip, jobs)):
+        left = round((index - 0.5 - xlim[0]) * px_per_unit)
+        strip = strip[:, max(0, -left):width_px - left]
+        left = max(0, left)
+
+        region = stitched[:, left:left + strip.shape[1]]
+        drawn = strip[..., 3] > 0
+        region[drawn] = strip[drawn]
+
+    # zorder 2, as the crests drawn serially: over the bars, under the threshold lines
+    ax.add_artist(StitchedColumns(ax, stitched, xlim, ylim, dpi))
+
+    label_sprites = LabelSprites(ax)
+    for index, column in enumerate(columns):
+        add_column_labels(label_sprites, (index - barwidth / 2) + barwidth / 2, column)
+    ax.add_artist(label_sprites)
+    ax.set_xticks(range(len(columns)), [column.short_name for column in columns])
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+
+
+class StitchedColumns(Artist):
+    """
+    The stitched column image, copied straight onto the canvas when drawn at the dpi
+    it was rendered at, and resized to fit the axes at any other dpi.
+    """
+    def __init__(self, ax, image, xlim, ylim, dpi, zorder=2):
+        super().__init__()
+        self.set_zorder(zorder)
+        self.axes = ax
+        self.set_figure(ax.figure)
+        self.image = image
+        self.xlim = xlim
+        self.ylim = ylim
+        self.dpi = dpi
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+
+        (left, bottom), (right, top) = self.axes.transData.transform(
+            [(self.xlim[0], self.ylim[0]), (self.xlim[1], self.ylim[1])])
+
+        image = self.image
+        size = (round(right - left), round(top - bottom))
+        if renderer.dpi != self.dpi or size != (image.shape[1], image.shape[0]):
+            image = np.asarray(Image.fromarray(image).resize(size, Image.Resampling.LANCZOS))
+
+        # renderer.draw_image takes rows from the bottom up
+        gc = renderer.new_gc()
+        renderer.draw_image(gc, round(left), round(bottom), image[::-1].copy())
+        gc.restore()
+        self.stale = False
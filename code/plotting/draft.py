@@ -0,0 +1,135 @@
+"""Quick low resolution renders for tuning the chart config, re-rendered as the config changes"""
+
+from collections import OrderedDict
+import os
+import runpy
+import time
+import numpy as np
+from matplotlib.transforms import Bbox
+
+DRAFT_DPI = 72
+
+# crests are drawn at most ~45px across at DRAFT_DPI
+THUMBNAIL_PX = 48
+
+# distance from the axes to the edge of the tight bounding box, in inches, as measured
+# on full renders: y tick labels and label, crests and x axis label, twin axis label, title
+DRAFT_MARGINS = {'left': 1.1, 'bottom': 1.26, 'right': 0.7, 'top': 0.8}
+
+# shared by every draft in this process, id(crest): (crest, thumbnail)
+_THUMBNAILS = OrderedDict()
+MAX_THUMBNAILS = 256
+
+
+def thumbnail(crest):
+    """
+    Small RGBA array of a crest, resized once per process. Arrays are drawn
+    as they are, where images are converted again on every draw.
+    """
+    cached = _THUMBNAILS.get(id(crest))
+    if cached is None or cached[0] is not crest:
+        small = crest.resize((THUMBNAIL_PX, THUMBNAIL_PX)).convert('RGBA')
+        cached = (crest, np.asarray(small))
+        _THUMBNAILS[id(crest)] = cached
+        while len(_THUMBNAILS) > MAX_THUMBNAILS:
+            _THUMBNAILS.popitem(last=False)
+    return cached[1]
+
+
+class CrestOverlay():
+    """
+    Collects the crests draw_team_column would draw one by one, then pastes them into a
+    single RGBA image drawn with one imshow, like the run-in view's crest overlay.\n
+    Every crest must be an array of the same size, e.g. a thumbnail, and is placed on a
+    grid of one array pixel per crest pixel, so nothing is resized.
+    """
+    def __init__(self):
+        self.crests = []
+
+    def add(self, crest, extent):
+        """Add a crest to be drawn at extent [left, right, bottom, top], in data coordinates"""
+        self.crests.append((crest, extent))
+
+    def draw(self, ax, zorder=2):
+        """Draw every crest added so far on 'ax', as one image"""
+        if not self.crests:
+            return
+
+        extents = np.array([extent for _crest, extent in self.crests])
+        height_px, width_px = self.crests[0][0].shape[:2]
+        left, right, bottom, top = extents[0]
+        px_per_x, px_per_y = width_px / (right - left), height_px / (top - bottom)
+
+        x0, y1 = extents[:, 0].min(), extents[:, 3].max()
+        x1, y0 = extents[:, 1].max(), extents[:, 2].min()
+        overlay = np.zeros((round((y1 - y0) * px_per_y), round((x1 - x0) * px_per_x), 4),
+                           dtype=np.uint8)
+
+        for crest, (left, _right, _bottom, top) in self.crests:
+            row = min(round((y1 - top) * px_per_y), overlay.shape[0] - height_px)
+            col = min(round((left - x0) * px_per_x), overlay.shape[1] - width_px)
+            overlay[row:row + height_px, col:col + width_px] = crest
+
+        ax.imshow(overlay, extent=[x0, x1, y0, y1], aspect='auto', zorder=zorder)
+        self.crests = []
+
+
+def draft_bbox(fig, ax, texts=(), pad_inches=0.25):
+    """
+    Bounding box of the chart in inches, worked out from the axes position and
+    DRAFT_MARGINS instead of drawing the figure to measure it.\n
+    'texts' are left aligned text artists in the axes that may stick out past its right
+    edge, e.g. threshold labels. Their width is estimated from the number of characters.
+    """
+    fig_width, fig_height = fig.get_size_inches()
+    position = ax.get_position()
+
+    x0 = position.x0 * fig_width - DRAFT_MARGINS['left']
+    y0 = position.y0 * fig_height - DRAFT_MARGINS['bottom']
+    x1 = position.x1 * fig_width + DRAFT_MARGINS['right']
+    y1 = position.y1 * fig_height + DRAFT_MARGINS['top']
+
+    for text in texts:
+        if text is None:
+            continue
+        left = ax.transData.transform(text.get_position())[0] / fig.dpi
+        # average character width is about 0.6em for the semibold sans-serif labels
+        x1 = max(x1, left + 0.6 * len(text.get_text()) * text.get_fontsize() / 72)
+
+    return Bbox.from_extents(x0, y0, x1, y1).padded(pad_inches)
+
+
+def watch_config(config_path, render, interval=0.5):
+    """
+    Call render(config) with the module level variables of 'config_path', then again
+    every time the file is saved, until interrupted.\n
+    'render' is given the previous figure back, so it can be redrawn in place.
+    """
+    # only the watch needs a window, and with it pyplot's global figure manager
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+    plt.ion()
+    fig = None
+    last_modified = None
+
+    try:
+        while True:
+            modified = os.stat(config_path).st_mtime
+            if modified != last_modified:
+                last_modified = modified
+                start = time.time()
+                try:
+                    config = runpy.run_path(config_path, run_name='config')
+                    fig = render(config, fig)
+                    fig.canvas.draw_idle()
+                    print(f'Redrawn in {round(time.time() - start, 3)} sec.')
+                except Exception as exc:  # pylint: disable=broad-except
+                    # keep watching, the next save may fix it
+                    print(f'Draft failed: {exc!r}')
+
+            if fig is not None:
+                plt.pause(interval)
+            else:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
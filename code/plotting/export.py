@@ -0,0 +1,99 @@
+"""Memory-bounded PNG export, rendering the figure in horizontal bands"""
+
+from contextlib import nullcontext
+import os
+import struct
+import sys
+import zlib
+from io import BytesIO
+import numpy as np
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.transforms import Bbox
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+    import psutil
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB"""
+    if resource is None:
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def tight_bbox(fig, dpi, pad_inches):
+    """
+    Tight bounding box of the figure in inches, as savefig(bbox_inches='tight') finds it.\n
+    Text is measured with a 1x1 renderer, so the full canvas is never allocated.
+    """
+    orig_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        bbox = fig.get_tightbbox(RendererAgg(1, 1, dpi))
+    finally:
+        fig.dpi = orig_dpi
+
+    return bbox.padded(pad_inches)
+
+
+def _png_chunk(tag, data):
+    return (struct.pack('>I', len(data)) + tag + data
+            + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+
+def save_png_banded(fig, file_path, dpi=300, pad_inches=0.25, band_mb=32):
+    """
+    Save the figure as a PNG, equivalent to
+    savefig(file_path, bbox_inches='tight', pad_inches=pad_inches, dpi=dpi).\n
+    The image is drawn one horizontal band at a time, each band at most 'band_mb'
+    megabytes, and rows are streamed into the PNG encoder as each band finishes.
+    'file_path' can also be a binary file object to write to.\n
+    Returns the peak resident memory of the process in MB.
+    """
+    bbox = tight_bbox(fig, dpi, pad_inches)
+    width = int(bbox.width * dpi)
+    height = int(bbox.height * dpi)
+    band_rows = max(1, int(band_mb * 2**20) // (width * 4))
+
+    compressor = zlib.compressobj(6)
+    pixels_per_metre = int(round(dpi / 0.0254))
+
+    with (open(file_path, 'wb') if isinstance(file_path, (str, os.PathLike))
+          else nullcontext(file_path)) as png:
+        png.write(b'\x89PNG\r\n\x1a\n')
+        png.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        png.write(_png_chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1)))
+
+        # Agg anchors the canvas at the bottom of the bbox and truncates its height,
+        # so rows are counted down from the top of that truncated canvas
+        canvas_top = bbox.y0 + height / dpi
+
+        for first_row in range(0, height, band_rows):
+            rows = min(band_rows, height - first_row)
+
+            # band top is padded by half a pixel so the canvas rounds down to 'rows'
+            band_bottom = canvas_top - (first_row + rows) / dpi
+            band_top = band_bottom + (rows + 0.5) / dpi
+            band = Bbox([[bbox.x0, band_bottom], [bbox.x1, band_top]])
+
+            buffer = BytesIO()
+            fig.savefig(buffer, format='rgba', dpi=dpi, bbox_inches=band)
+            pixels = np.frombuffer(buffer.getbuffer(), dtype=np.uint8).reshape(-1, width * 4)
+
+            # each PNG scanline starts with its filter type, 0 (None)
+            scanlines = np.zeros((rows, width * 4 + 1), dtype=np.uint8)
+            scanlines[:, 1:] = pixels[:rows]
+            png.write(_png_chunk(b'IDAT', compressor.compress(scanlines.tobytes())))
+
+            del buffer, pixels, scanlines
+
+        png.write(_png_chunk(b'IDAT', compressor.flush()))
+        png.write(_png_chunk(b'IEND', b''))
+
+    return peak_rss_mb()
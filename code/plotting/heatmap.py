@@ -0,0 +1,153 @@
+"""Run-in view: a team by remaining fixture grid coloured by difficulty, drawn as one image"""
+
+from datetime import datetime
+from io import BytesIO
+import os
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from matplotlib.colors import to_rgb
+from data.loaders import load_standings
+from data.table_data import compute_table
+from utils import utils
+from utils.utils import output_folder
+from .labels import ordinal_suffix
+from .style import FIXTURE_COLOURS
+
+# pixels per grid cell in the crest overlay, and the crest size inside it
+CELL_PX = 64
+CREST_PX = 44
+
+# palette row of each difficulty, after white for cells with no fixture
+DIFFICULTIES = list(FIXTURE_COLOURS)
+PALETTE = np.array([(1.0, 1.0, 1.0)] + [to_rgb(FIXTURE_COLOURS[key]) for key in DIFFICULTIES])
+PALETTE_ROWS = {key: row for row, key in enumerate(DIFFICULTIES, start=1)}
+
+SORTS = ['table', 'strength']
+
+
+def difficulty_matrix(standings, fixtures):
+    """
+    Teams by remaining fixtures, in the order of 'standings'.\n
+    Returns the palette index of every cell (0 for no fixture), the numeric difficulty
+    of every cell (NaN for no fixture, TBC and cancelled) and the opponent id of every
+    cell (-1 for no fixture).
+    """
+    rows = {team_id: row for row, team_id in enumerate(standings['id'])}
+    cols = int(fixtures['order'].max()) if len(fixtures.index) else 0
+    shape = (len(standings.index), max(cols, 1))
+
+    row = fixtures['team_id'].map(rows).to_numpy(dtype=np.intp)
+    col = fixtures['order'].to_numpy(dtype=np.intp) - 1
+    difficulty = fixtures['opposition_difficulty'].to_numpy(dtype=str)
+
+    palette_index = np.zeros(shape, dtype=np.intp)
+    palette_index[row, col] = (fixtures['opposition_difficulty'].map(PALETTE_ROWS)
+                               .fillna(PALETTE_ROWS['TBC']).to_numpy(dtype=np.intp))
+
+    strength = np.full(shape, np.nan)
+    numeric = np.char.isdigit(difficulty)
+    strength[row[numeric], col[numeric]] = difficulty[numeric].astype(float)
+
+    opponents = np.full(shape, -1, dtype=np.int64)
+    opponents[row, col] = fixtures['opposition_id'].to_numpy(dtype=np.int64)
+
+    return palette_index, strength, opponents
+
+
+def crest_overlay(opponents, team_crest):
+    """
+    One RGBA image of every opponent crest, CELL_PX pixels per cell, with each
+    crest resized once however many times it appears.
+    """
+    rows, cols = opponents.shape
+    overlay = np.zeros((rows * CELL_PX, cols * CELL_PX, 4), dtype=np.uint8)
+
+    margin = (CELL_PX - CREST_PX) // 2
+    for opponent in np.unique(opponents[opponents >= 0]):
+        crest = np.asarray(team_crest[opponent].resize((CREST_PX, CREST_PX)).convert('RGBA'))
+        for row, col in zip(*np.nonzero(opponents == opponent)):
+            top, left = row * CELL_PX + margin, col * CELL_PX + margin
+            overlay[top:top + CREST_PX, left:left + CREST_PX] = crest
+
+    return overlay
+
+
+def generate_heatmap(competition: str, lines_to_generate: list, title_text_1: str,
+                     file_text: str, pos_one=1, pos_two=20, data=None, sort='table',
+                     as_bytes=False):
+    """
+    Draw the remaining fixtures of every shown team as a grid, coloured by difficulty.\n
+    Takes the same arguments as table_gen.generate_table, and:\n
+        sort -- 'table' to keep the order of the race chart, or 'strength' to put the
+        hardest average remaining schedule first, teams with no known fixtures last
+        (default 'table')\n
+    Returns the path of the saved image, or the PNG as bytes if as_bytes is set.
+    """
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort '{sort}'. Choose from: {', '.join(SORTS)}")
+
+    teams, df2, team_crest = data if data is not None else load_standings(competition)
+    tables = compute_table(competition, lines_to_generate, pos_one, pos_two,
+                           data=(teams, df2, team_crest))
+    standings, fixtures = tables['standings'], tables['fixtures']
+
+    palette_index, strength, opponents = difficulty_matrix(standings, fixtures)
+
+    # mean difficulty of each team's known fixtures, NaN for teams with none
+    known = (~np.isnan(strength)).sum(axis=1)
+    run_in = np.where(known > 0, np.nansum(strength, axis=1) / np.maximum(known, 1), np.nan)
+    if sort == 'strength':
+        order = np.argsort(-np.nan_to_num(run_in, nan=-np.inf), kind='stable')
+        palette_index, opponents, run_in = palette_index[order], opponents[order], run_in[order]
+        standings = standings.iloc[order]
+
+    rows, cols = palette_index.shape
+    fig = Figure(figsize=(2 + 0.45 * cols, 1.6 + 0.45 * rows), dpi=150)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    extent = (-0.5, cols - 0.5, rows - 0.5, -0.5)
+    ax.imshow(PALETTE[palette_index], extent=extent, interpolation='nearest')
+    ax.imshow(crest_overlay(opponents, team_crest), extent=extent, interpolation='bilinear')
+
+    # cell borders
+    ax.set_xticks(np.arange(-0.5, cols), minor=True)
+    ax.set_yticks(np.arange(-0.5, rows), minor=True)
+    ax.grid(which='minor', color='#808080', linewidth=1)
+    ax.tick_params(which='minor', length=0)
+
+    ax.set_xticks(range(cols), [str(col + 1) for col in range(cols)])
+    ax.set_yticks(range(rows), [
+        f'{name} ({mean:.1f})' if not np.isnan(mean) else name
+        for name, mean in zip(standings['short_name'], run_in)
+    ])
+    ax.tick_params(axis='both', labelsize='small')
+    ax.xaxis.tick_top()
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    cur_day = datetime.today().strftime('%d-%m-%y')
+    ax.set_title(
+        f"{title_text_1.strip()}: remaining fixtures\n"
+        f"{ordinal_suffix(pos_one)} to {ordinal_suffix(pos_two)} as of {cur_day}, "
+        f"{utils.get_current_gameweek(df2)}",
+        size=12, fontname='sans-serif', weight='semibold', pad=12)
+    ax.legend(handles=[Patch(facecolor=FIXTURE_COLOURS[key], edgecolor='#808080', label=key)
+                       for key in DIFFICULTIES],
+              loc='upper center', bbox_to_anchor=(0.5, 0), ncols=len(DIFFICULTIES),
+              frameon=False, fontsize='small')
+
+    if as_bytes:
+        output = BytesIO()
+    else:
+        base_folder = output_folder(competition)
+        os.makedirs(base_folder, exist_ok=True)
+        date_time = datetime.today().strftime('%d-%m-%y %H.%M')
+        output = os.path.join(base_folder, f'{file_text} run-in {date_time}.png')
+
+    fig.savefig(output, bbox_inches='tight', pad_inches=0.25, format='png')
+    fig.clear()
+
+    return output.getvalue() if as_bytes else output
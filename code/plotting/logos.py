@@ -2,12 +2,17 @@
 
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from PIL import Image
+from data.loaders.crests import LOGO_DIR
+from utils.utils import ROOT_DIR
 
-def replace_xticks_with_logos(ax, tick_ids, team_crest, min_lim):
+COMP_LOGO_DIR = LOGO_DIR / 'COMPS'
+KEY_PATH = ROOT_DIR / 'key.png'
+
+def replace_xticks_with_logos(ax, tick_ids, team_crest, min_lim, zoom=0.18):
     """Replace x-tick labels with team crests"""
     for i, team_id in enumerate(tick_ids):
         img = team_crest[team_id]
-        im = OffsetImage(img, zoom=0.18)
+        im = OffsetImage(img, zoom=zoom)
         im.image.axes = ax
         ab = AnnotationBbox(im, (i, min_lim), xybox=(0., -30.),
                             frameon=False, xycoords="data",
@@ -29,14 +34,16 @@ def add_comp_logo(ax, comp_name, x, w, points, row_colour):
     cyheight = cytop - cybot
 
     # load comp logo, plot logo and team coloured box behind for visibility
-    crb =  Image.open(f"Logos/COMPS/{comp_name}LOGO.png").convert('RGBA')
+    crb =  Image.open(COMP_LOGO_DIR / f"{comp_name}LOGO.png").convert('RGBA')
     ax.imshow(crb, extent=[cxleft, cxright, cybot, cytop], aspect='auto', zorder=5)
     ax.bar(cxleft+(cxwid/2), cyheight, bottom=cybot, width=cxwid,
            color=row_colour, edgecolor=row_colour, lw=1, zorder=4)
 
 def add_key(ax, colours):
     """Add graph key, and calculations to place the key"""
-    key_im = Image.open('key.png')
+    key_im = Image.open(KEY_PATH)
+    # read the pixels now, which also closes the file
+    key_im.load()
 
     # horizontal
     kxwid = 3.6
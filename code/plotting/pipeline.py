@@ -0,0 +1,110 @@
+"""Stages of a render that don't depend on each other, run at the same time"""
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties, findfont, get_font
+from data.loaders import load_standings
+from data.loaders.crests import preload_crests
+from .style import style_static_axes
+
+# greyscale copies of the shared decoded crests, id(crest): (crest, greyscale crest)
+_GREY_CRESTS = {}
+
+
+class StageTimer():
+    """Start and end of each named stage, in seconds since the timer was created"""
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages = {}
+        self._current = None
+
+    def run(self, name, func, *args):
+        """Run func(*args) as the stage 'name', recording when it started and ended"""
+        start = time.perf_counter() - self.origin
+        result = func(*args)
+        self.stages[name] = (start, time.perf_counter() - self.origin)
+        return result
+
+    def begin(self, name):
+        """Start the next stage on the calling thread, ending the one it started before"""
+        now = time.perf_counter() - self.origin
+        self.end()
+        self._current = (name, now)
+
+    def end(self):
+        """End the stage started by begin, if there is one"""
+        if self._current:
+            name, start = self._current
+            self.stages[name] = (start, time.perf_counter() - self.origin)
+            self._current = None
+
+    def report(self):
+        """One line per stage, with the end to end time last"""
+        self.end()
+        lines = [f'{name}: {round(start, 3)} - {round(end, 3)} sec.'
+                 for name, (start, end) in self.stages.items()]
+        lines.append(f'End to end: {round(time.perf_counter() - self.origin, 3)} sec.')
+        return '\n'.join(lines)
+
+
+def prepare_assets(competition):
+    """
+    Decode every crest in the league, and a greyscale copy of each for the fixture boxes.\n
+    Both are made once per process, so repeated renders reuse the same images.
+    """
+    grey_crests = {}
+    for team_id, crest in preload_crests(competition).items():
+        cached = _GREY_CRESTS.get(id(crest))
+        if cached is None or cached[0] is not crest:
+            cached = (crest, crest.convert('LA'))
+            _GREY_CRESTS[id(crest)] = cached
+        grey_crests[team_id] = cached[1]
+    return grey_crests
+
+
+def load_fonts():
+    """Find and load the fonts used by the labels, once per process"""
+    for weight in ('normal', 'semibold'):
+        get_font(findfont(FontProperties(family='sans-serif', weight=weight)))
+
+
+def setup_figure(figsize, fig=None):
+    """
+    Create the figure, or clear 'fig' to draw on it again, and apply all the styling
+    that doesn't depend on the data, loading the fonts used by the labels on the way
+    """
+    load_fonts()
+
+    if fig is None:
+        # not through pyplot, so the figure is freed as soon as the render drops it
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+    else:
+        fig.clear()
+        fig.set_size_inches(figsize)
+        ax = fig.add_subplot()
+    style_static_axes(ax)
+    return fig, ax
+
+
+def start_render(competition, figsize, timer, data=None, fig=None):
+    """
+    Fetch the league data, decode the crests and set up the figure at the same time.\n
+    The fetch and crest decoding run in background threads while the figure is set up
+    in this one, as matplotlib figures aren't thread safe. The fetch is skipped if
+    'data' is already loaded, and 'fig' is cleared and reused if given.\n
+    Returns (teams, fixtures, team_crest), {team id: greyscale crest}, fig and ax
+    once all three are done.
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fetch = None if data is not None else pool.submit(
+            timer.run, 'Fetch data', load_standings, competition)
+        assets = pool.submit(timer.run, 'Prepare crests', prepare_assets, competition)
+
+        fig, ax = timer.run('Set up figure', setup_figure, figsize, fig)
+
+        data = data if fetch is None else fetch.result()
+        return data, assets.result(), fig, ax
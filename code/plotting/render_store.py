@@ -0,0 +1,186 @@
+"""Content-addressed store of rendered tables, so identical inputs are never rendered twice"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import hashlib
+import json
+import os
+import shutil
+import time
+from data.loaders import load_standings
+from data.loaders.crests import preload_crests
+from data.transformers import points_deductions
+from utils.utils import ROOT_DIR
+
+# bump whenever a change to the plotting code changes the rendered image
+RENDERER_VERSION = 2
+
+MAX_STORE_MB = 500
+
+FIXTURE_COLUMNS = ['team_h', 'team_a', 'team_h_score', 'team_a_score', 'status',
+                   'kickoff_time', 'team_h_difficulty', 'team_a_difficulty',
+                   'event', 'started', 'finished_provisional']
+TEAM_COLUMNS = ['id', 'short_name', 'colours']
+
+
+# generate_table arguments the store can't hold the result of, or that aren't plain values
+UNCACHEABLE_OPTIONS = ['as_bytes', 'fig', 'data', 'prepared']
+
+
+def render_options(draft=False, workers=None, band_mb=None):
+    """
+    The generate_table options that change the output file, so a draft or a differently
+    stitched image never shares a digest with a full render. The DPI is set by 'draft'.
+    """
+    return {
+        'draft': draft,
+        'workers': workers,
+        'band_mb': band_mb,
+        'format': 'png',
+    }
+
+
+def input_digest(competition, lines_to_generate, title_text_1, pos_one, pos_two, teams, df2,
+                 options=None):
+    """
+    sha256 of everything that affects the rendered image:\n
+    fixtures, points deductions, threshold lines, position range, title, render options
+    (see render_options) and renderer version.\n
+    The title carries the current date, so the date is part of the digest too.
+    """
+    fixtures = df2[[c for c in FIXTURE_COLUMNS if c in df2.columns]].astype(str)
+    fixtures = fixtures.sort_values(list(fixtures.columns)).to_csv(index=False)
+
+    team_info = teams[TEAM_COLUMNS].astype(str).sort_values('id').to_csv(index=False)
+    deductions = {str(team_id): points_deductions(team_id, 0, 0) for team_id in teams['id']}
+
+    config = {
+        'competition': competition,
+        'lines': lines_to_generate,
+        'title': title_text_1,
+        'positions': [pos_one, pos_two],
+        'date': datetime.today().strftime('%d-%m-%y'),
+        'deductions': deductions,
+        'options': options if options is not None else render_options(),
+        'renderer': RENDERER_VERSION,
+    }
+
+    sha256 = hashlib.sha256()
+    sha256.update(json.dumps(config, sort_keys=True).encode('utf-8'))
+    sha256.update(team_info.encode('utf-8'))
+    sha256.update(fixtures.encode('utf-8'))
+    return sha256.hexdigest()
+
+
+class RenderStore():
+    """Directory of rendered images keyed by the digest of their inputs, with a JSON index"""
+    def __init__(self, root=None, max_mb=MAX_STORE_MB):
+        self.root = root or os.path.join(ROOT_DIR, '.render_store')
+        self.index_path = os.path.join(self.root, 'index.json')
+        self.max_bytes = max_mb * 2**20
+        self.index = self._read_index()
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, encoding='utf-8') as index_file:
+            return json.load(index_file)
+
+    def _write_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self.index, index_file, indent=2)
+
+    def get(self, digest):
+        """Path of the stored image for 'digest', or None if it has not been rendered"""
+        entry = self.index.get(digest)
+        if entry is None:
+            return None
+
+        path = os.path.join(self.root, entry['file'])
+        if not os.path.exists(path):
+            del self.index[digest]
+            self._write_index()
+            return None
+
+        entry['last_used'] = time.time()
+        self._write_index()
+        return path
+
+    def put(self, digest, file_path):
+        """Copy a rendered image into the store, then collect garbage. Returns the stored path"""
+        os.makedirs(self.root, exist_ok=True)
+        stored_name = digest + os.path.splitext(file_path)[1]
+        shutil.copyfile(file_path, os.path.join(self.root, stored_name))
+
+        now = time.time()
+        self.index[digest] = {
+            'file': stored_name,
+            'source': os.path.basename(file_path),
+            'size': os.path.getsize(file_path),
+            'created': now,
+            'last_used': now,
+        }
+        self.gc()
+        return os.path.join(self.root, stored_name)
+
+    def gc(self):
+        """Remove least recently used images until the store is under its size limit"""
+        total = sum(entry['size'] for entry in self.index.values())
+        by_last_use = sorted(self.index.items(), key=lambda item: item[1]['last_used'])
+
+        for digest, entry in by_last_use:
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.root, entry['file'])
+            if os.path.exists(path):
+                os.remove(path)
+            total -= entry['size']
+            del self.index[digest]
+
+        self._write_index()
+
+
+def generate_table_cached(competition: str, lines_to_generate: list, title_text_1: str,
+                          file_text: str, pos_one=1, pos_two=20, store=None, **kwargs):
+    """
+    Same as table_gen.generate_table, but returns the stored image straight away if the
+    same inputs have been rendered before.\n
+    The data is fetched in the background while matplotlib, the plotting code and the
+    fonts are loaded, as start_render does for generate_table, so a cache miss doesn't
+    wait for both one after the other. A cache hit still loads them, costing CPU time
+    but no extra wall time unless the fetch is quicker than the imports.\n
+    Extra keyword arguments are passed on to generate_table and are part of the digest.
+    as_bytes, fig, data and prepared aren't accepted, as the result has to be a file in the store.
+    """
+    uncacheable = [option for option in UNCACHEABLE_OPTIONS if option in kwargs]
+    if uncacheable:
+        raise TypeError(f"generate_table_cached doesn't accept {', '.join(uncacheable)}")
+    options = render_options(**kwargs)
+
+    # fetch the data and decode the crests while the plotting code is loaded
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fetch = pool.submit(load_standings, competition)
+        pool.submit(preload_crests, competition)
+
+        # pylint: disable=import-outside-toplevel
+        from plotting import table_gen
+        from plotting.pipeline import load_fonts
+        load_fonts()
+
+        data = fetch.result()
+    teams, df2, _team_crest = data
+
+    digest = input_digest(competition, lines_to_generate, title_text_1,
+                          pos_one, pos_two, teams, df2, options)
+    store = store or RenderStore()
+
+    cached = store.get(digest)
+    if cached is not None:
+        print(f'Inputs unchanged, reusing {cached}')
+        return cached
+
+    file_path = table_gen.generate_table(competition, lines_to_generate, title_text_1,
+                                         file_text, pos_one, pos_two, data=data, **kwargs)
+    store.put(digest, file_path)
+    return file_path
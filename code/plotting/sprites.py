@@ -0,0 +1,108 @@
+"""Cache of rasterized text labels, so each distinct label is only laid out once per process"""
+
+from collections import OrderedDict
+import math
+import threading
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+
+
+class SpriteCache():
+    """Bounded LRU of label sprites, keyed by (text, font, size, weight, colour, dpi)"""
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._sprites = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, fontname, size, weight, colour, dpi):
+        """
+        RGBA array of the label drawn at 'dpi', and the baseline position
+        in pixels from the bottom of the array
+        """
+        key = (text, fontname, size, weight, colour, dpi)
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+
+        sprite = rasterize_label(text, fontname, size, weight, colour, dpi)
+
+        with self._lock:
+            self.misses += 1
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.maxsize:
+                self._sprites.popitem(last=False)
+        return sprite
+
+
+# shared by every render in this process
+SPRITES = SpriteCache()
+
+
+def rasterize_label(text, fontname, size, weight, colour, dpi):
+    """Draw a single label onto a transparent canvas just large enough to hold it"""
+    prop = FontProperties(family=fontname, size=size, weight=weight)
+    width, height, descent = RendererAgg(1, 1, dpi).get_text_width_height_descent(
+        text, prop, ismath=False)
+
+    pad = 2
+    width_px = math.ceil(width) + 2 * pad
+    height_px = math.ceil(height) + 2 * pad
+    baseline = pad + round(descent)
+
+    fig = Figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    fig.patch.set_alpha(0)
+    fig.text(pad / width_px, baseline / height_px, text, fontproperties=prop,
+             color=colour, ha='left', va='baseline')
+    canvas.draw()
+
+    # renderer.draw_image takes rows from the bottom up
+    return np.asarray(canvas.buffer_rgba())[::-1].copy(), baseline
+
+
+class LabelSprites(Artist):
+    """
+    Draws many small text labels as cached sprites, in a single artist.\n
+    Labels are placed like ax.text(x, y, text, ha='center'), with x and y in data
+    coordinates. Sprites are rasterized at the dpi being drawn, so output is
+    pixel-aligned at any resolution.
+    """
+    def __init__(self, ax, fontname='sans-serif', size='x-small', weight='semibold',
+                 cache=SPRITES, zorder=3):
+        super().__init__()
+        self.set_zorder(zorder)
+        self.axes = ax
+        self.set_figure(ax.figure)
+        self.fontname = fontname
+        self.size = size
+        self.weight = weight
+        self.cache = cache
+        self.labels = []
+
+    def add(self, x, y, text, colour):
+        """Add a label centred on x, with its baseline at y"""
+        if text:
+            self.labels.append((x, y, text, colour))
+
+    def draw(self, renderer):
+        if not self.get_visible() or not self.labels:
+            return
+
+        positions = self.axes.transData.transform([(x, y) for x, y, _t, _c in self.labels])
+        gc = renderer.new_gc()
+
+        for (px, py), (_x, _y, text, colour) in zip(positions, self.labels):
+            rgba, baseline = self.cache.get(text, self.fontname, self.size,
+                                            self.weight, colour, renderer.dpi)
+            renderer.draw_image(gc, round(px - rgba.shape[1] / 2), round(py - baseline), rgba)
+
+        gc.restore()
+        self.stale = False
@@ -3,19 +3,36 @@
 import matplotlib.ticker as plticker
 from matplotlib.ticker import AutoMinorLocator
 
+# Fixture Difficulty Colours
+FIXTURE_COLOURS = {'1': '#68c47d',
+                   '2': '#b5f7c6',
+                   '3': '#e7e7e7',
+                   '4': '#f5a1b2',
+                   '5': '#f47272',
+                   'TBC': '#a1a1a1',
+                   'CAN': "#fdd663"
+                   }
+
+def style_static_axes(ax):
+    """Apply the styling that doesn't depend on the data (tick sizes, grid, spines)."""
+    ax.tick_params(axis='y', which='both', length=4, width=1)
+    ax.tick_params(axis='x', which='both', pad=15)
+    ax.set_axisbelow(True)
+    ax.grid(which='major', axis='y', linestyle=(0, (4, 4)))
+
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_linewidth(2)
+    ax.spines['left'].set_linewidth(2)
+
 def style_axes(ax, ax_width, y_labelsize):
-    """Apply styling to axes (grid, ticks, spines)."""
+    """Apply styling to axes (tick locators, label spacing, bottom spine)."""
     intervals = float(5)
     loc = plticker.MultipleLocator(base=intervals)
     ax.yaxis.set_major_locator(loc)
     minor_locator = AutoMinorLocator(intervals)
     ax.yaxis.set_minor_locator(minor_locator)
 
-    ax.tick_params(axis='y', which='both', length=4, width=1)
-    ax.tick_params(axis='x', which='both', pad=15)
-    ax.set_axisbelow(True)
-    ax.grid(which='major', axis='y', linestyle=(0, (4, 4)))
-
     ax2 = ax.twinx()
     ax2.set_ylabel("Pgl", labelpad=15, size=y_labelsize, fontname="sans-serif",
                    weight="semibold", color="w", zorder=0)
@@ -23,8 +40,4 @@ def style_axes(ax, ax_width, y_labelsize):
     ax2.tick_params(left=False, right=False, labelleft=False,
                     labelbottom=False, labelright=False, bottom=False)
 
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
     ax.spines['bottom'].set_bounds(-1, ax_width)
-    ax.spines['bottom'].set_linewidth(2)
-    ax.spines['left'].set_linewidth(2)
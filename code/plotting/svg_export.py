@@ -0,0 +1,250 @@
+"""Compact SVG and interactive HTML versions of the table, with each crest embedded once"""
+
+import base64
+from datetime import datetime
+from io import BytesIO
+import os
+from xml.sax.saxutils import escape, quoteattr
+from PIL import Image
+from data.loaders import load_standings
+from data.table_data import compute_table
+from utils import utils
+from utils.utils import output_folder
+from .labels import ordinal_suffix
+from .style import FIXTURE_COLOURS
+
+# layout, in SVG user units
+COLUMN_WIDTH = 56
+BAR_WIDTH = COLUMN_WIDTH * 0.7
+POINT_HEIGHT = 12
+MARGIN_LEFT = 60
+MARGIN_RIGHT = 30
+MARGIN_TOP = 70
+MARGIN_BOTTOM = 90
+
+# crests are drawn at most BAR_WIDTH units across, with a palette of CREST_COLOURS
+CREST_PX = 40
+CREST_COLOURS = 64
+
+STYLE = '''
+text { font-family: sans-serif; font-weight: 600; }
+.title { font-size: 16px; text-anchor: middle; }
+.axis { font-size: 11px; fill: #333; }
+.grid { stroke: #bbb; stroke-dasharray: 4 4; }
+.box { stroke: #808080; stroke-width: 1.5; }
+.fx { font-size: 8px; fill: #757171; text-anchor: middle; }
+.stat { font-size: 8px; fill: white; text-anchor: middle; }
+.threshold { stroke-width: 1.5; stroke-dasharray: 5 5; }
+.threshold-label { font-size: 11px; }
+''' + ''.join(
+    f'.d{key} {{ fill: {colour}; }}\n' for key, colour in FIXTURE_COLOURS.items()
+)
+
+HTML_STYLE = '''
+body { margin: 0; display: flex; justify-content: center; background: #fff; }
+.fixture:hover .box { stroke: #000; stroke-width: 3; }
+#tip { position: fixed; pointer-events: none; display: none; padding: 4px 8px;
+       background: #222; color: #fff; font: 12px sans-serif; border-radius: 4px; }
+'''
+
+HTML_SCRIPT = '''
+const tip = document.getElementById('tip');
+document.querySelectorAll('[data-info]').forEach(el => {
+  el.addEventListener('mousemove', e => {
+    tip.textContent = el.dataset.info;
+    tip.style.display = 'block';
+    tip.style.left = (e.clientX + 12) + 'px';
+    tip.style.top = (e.clientY + 12) + 'px';
+  });
+  el.addEventListener('mouseleave', () => { tip.style.display = 'none'; });
+});
+'''
+
+
+def _num(value):
+    """A coordinate to one decimal place, without a trailing .0"""
+    return f'{value:.1f}'.removesuffix('.0')
+
+
+def _crest_data_uri(img):
+    """Small palette PNG thumbnail of a crest, as a data URI"""
+    thumb = img.convert('RGBA')
+    thumb.thumbnail((CREST_PX, CREST_PX))
+    # fast octree keeps the alpha channel, unlike the default median cut
+    thumb = thumb.quantize(CREST_COLOURS, method=Image.Quantize.FASTOCTREE)
+    buffer = BytesIO()
+    thumb.save(buffer, format='PNG', optimize=True)
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def crest_symbols(team_ids, team_crest):
+    """
+    One <symbol> per crest, plus a greyscale <symbol> that reuses it through a filter,
+    so each crest image is only embedded once however many times it is drawn.
+    """
+    symbols = ['<filter id="grey"><feColorMatrix type="saturate" values="0"/></filter>']
+    for team_id in sorted(team_ids):
+        symbols.append(
+            f'<symbol id="c{team_id}" viewBox="0 0 {CREST_PX} {CREST_PX}">'
+            f'<image href="{_crest_data_uri(team_crest[team_id])}" '
+            f'width="{CREST_PX}" height="{CREST_PX}"/></symbol>'
+        )
+        symbols.append(
+            f'<symbol id="g{team_id}" viewBox="0 0 {CREST_PX} {CREST_PX}">'
+            f'<use href="#c{team_id}" filter="url(#grey)"/></symbol>'
+        )
+    return symbols
+
+
+def fixture_boxes(fixtures):
+    """
+    One box per difficulty and opponent, coloured and with the greyscale crest, so each
+    fixture only needs a <use> of its box and its own label.\n
+    The boxes are groups rather than symbols, so their stroke isn't clipped at the edges.
+    They take their stroke from the <use>, which lets the HTML page restyle it on hover.
+    """
+    box = 3 * POINT_HEIGHT
+    crest_box = (f'x="{_num(BAR_WIDTH / 8.5)}" y="{_num(box * (1 - 1 / 1.09))}" '
+                 f'width="{_num(BAR_WIDTH * 0.77)}" height="{_num(box * 0.63)}"')
+
+    pairs = fixtures[['opposition_difficulty', 'opposition_id']].drop_duplicates()
+    return [f'<g id="b{difficulty}_{team_id}">'
+            f'<rect class="d{difficulty}" width="{_num(BAR_WIDTH)}" height="{box}"/>'
+            f'<use href="#g{team_id}" {crest_box}/></g>'
+            for difficulty, team_id in pairs.itertuples(index=False)]
+
+
+def build_svg(tables, team_crest, title_text, interactive=False):
+    """Build the SVG document from the dataframes returned by compute_table"""
+    standings = tables['standings']
+    fixtures = tables['fixtures']
+    thresholds = tables['thresholds']
+
+    min_lim = max(0, int(standings['points'].min()) - 3)
+    max_lim = int(standings['max_points'].max()) + 2
+
+    plot_width = COLUMN_WIDTH * len(standings.index)
+    plot_height = POINT_HEIGHT * (max_lim - min_lim)
+    width = MARGIN_LEFT + plot_width + MARGIN_RIGHT
+    height = MARGIN_TOP + plot_height + MARGIN_BOTTOM
+
+    def y_of(points):
+        return MARGIN_TOP + (max_lim - points) * POINT_HEIGHT
+
+    def x_of(index):
+        return MARGIN_LEFT + index * COLUMN_WIDTH + (COLUMN_WIDTH - BAR_WIDTH) / 2
+
+    team_ids = set(standings['id']) | set(fixtures['opposition_id'])
+    names = dict(zip(standings['id'], standings['name']))
+
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+           f'width="{width}" height="{height}">',
+           f'<style>{STYLE}</style>',
+           '<defs>', *crest_symbols(team_ids, team_crest), *fixture_boxes(fixtures), '</defs>']
+
+    # title, one <tspan> per line
+    out.append(f'<text class="title" x="{width / 2}" y="22">')
+    for i, line in enumerate(title_text.strip().split('\n')):
+        out.append(f'<tspan x="{width / 2}" dy="{0 if i == 0 else 20}">{escape(line.strip())}</tspan>')
+    out.append('</text>')
+
+    # y axis grid and labels every 5 points
+    for points in range(min_lim + 5 - min_lim % 5, max_lim + 1, 5):
+        y = y_of(points)
+        out.append(f'<line class="grid" x1="{MARGIN_LEFT}" x2="{MARGIN_LEFT + plot_width}" '
+                   f'y1="{y}" y2="{y}"/>')
+        out.append(f'<text class="axis" x="{MARGIN_LEFT - 8}" y="{y + 4}" '
+                   f'text-anchor="end">{points}</text>')
+
+    # where the label sits in every fixture box
+    label_pos = f'x="{_num(BAR_WIDTH / 2)}" y="{3 * POINT_HEIGHT - 3}"'
+
+    for index, team in enumerate(standings.itertuples()):
+        x = x_of(index)
+
+        # current points bar, with GD and MP labels
+        out.append(f'<rect x="{_num(x)}" y="{y_of(team.points)}" width="{_num(BAR_WIDTH)}" '
+                   f'height="{(team.points - min_lim) * POINT_HEIGHT}" fill="{team.colour}"/>')
+        if team.points > 0:
+            out.append(f'<text class="stat" x="{_num(x + BAR_WIDTH / 2)}" '
+                       f'y="{_num(y_of(team.points - 0.5))}">MP {team.played}</text>')
+            gd = f'+{team.goal_difference}' if team.goal_difference >= 0 else team.goal_difference
+            out.append(f'<text class="stat" x="{_num(x + BAR_WIDTH / 2)}" '
+                       f'y="{_num(y_of(team.points - 1))}">GD {gd}</text>')
+
+        # a box for every remaining fixture, stacked on top, drawn in box coordinates
+        bottom = team.points
+        for fixture in fixtures[fixtures['team_id'] == team.id].itertuples():
+            # only the page shows the fixture details, in its own tooltip
+            attrs = ''
+            if interactive:
+                info = (f'{team.name} v {fixture.opposition_name} ({fixture.fixture_location}), '
+                        f'{fixture.location_date}, difficulty {fixture.opposition_difficulty}')
+                attrs = f' data-info={quoteattr(info)}'
+
+            out.append(f'<g class="fixture" transform="translate({_num(x)} {y_of(bottom + 3)})"'
+                       f'{attrs}><use class="box" '
+                       f'href="#b{fixture.opposition_difficulty}_{fixture.opposition_id}"/>'
+                       f'<text class="fx" {label_pos}>{escape(fixture.location_date)}</text></g>')
+            bottom += 3
+
+        # crest in place of the x tick label
+        out.append(f'<use href="#c{team.id}" x="{_num(x)}" y="{MARGIN_TOP + plot_height + 8}" '
+                   f'width="{_num(BAR_WIDTH)}" height="{_num(BAR_WIDTH)}">'
+                   f'<title>{escape(names[team.id])}</title></use>')
+
+    for line in thresholds[thresholds['shown']].itertuples():
+        y = y_of(line.points_required)
+        out.append(f'<line class="threshold" stroke="{line.colour}" x1="{MARGIN_LEFT}" '
+                   f'x2="{MARGIN_LEFT + plot_width}" y1="{y}" y2="{y}"/>')
+        label_index = standings.index[standings['max_points'] == line.points_required][0]
+        out.append(f'<text class="threshold-label" fill="{line.colour}" '
+                   f'x="{_num(x_of(standings.index.get_loc(label_index)) + BAR_WIDTH)}" y="{y - 3}">'
+                   f'{escape(line.label)}</text>')
+
+    # axes
+    axis_y = MARGIN_TOP + plot_height
+    out.append(f'<path d="M{MARGIN_LEFT} {MARGIN_TOP}V{axis_y}H{MARGIN_LEFT + plot_width}" '
+               f'fill="none" stroke="#000" stroke-width="2"/>')
+    out.append('</svg>')
+
+    return '\n'.join(out)
+
+
+def export_svg(competition: str, lines_to_generate: list, title_text_1: str,
+               file_text: str, pos_one=1, pos_two=20, data=None, html=False):
+    """
+    Save the table as a compact SVG, or as an HTML page with hover details per fixture.\n
+    Takes the same arguments as table_gen.generate_table. Returns the path of the saved file.
+    """
+    teams, df2, team_crest = data if data is not None else load_standings(competition)
+    tables = compute_table(competition, lines_to_generate, pos_one, pos_two,
+                           data=(teams, df2, team_crest))
+
+    cur_day = datetime.today().strftime('%d-%m-%y')
+    title_text = (
+        f"{title_text_1}\n"
+        f"{ordinal_suffix(pos_one)} to {ordinal_suffix(pos_two)} as of {cur_day}, "
+        f"{utils.get_current_gameweek(df2)}"
+    )
+
+    svg = build_svg(tables, team_crest, title_text, interactive=html)
+
+    base_folder = output_folder(competition)
+    os.makedirs(base_folder, exist_ok=True)
+    date_time = datetime.today().strftime('%d-%m-%y %H.%M')
+
+    if html:
+        file_path = os.path.join(base_folder, f'{file_text} {date_time}.html')
+        document = (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+                    f'<title>{escape(title_text_1.strip())}</title>'
+                    f'<style>{HTML_STYLE}</style></head><body>\n{svg}\n'
+                    f'<div id="tip"></div><script>{HTML_SCRIPT}</script></body></html>\n')
+    else:
+        file_path = os.path.join(base_folder, f'{file_text} {date_time}.svg')
+        document = svg + '\n'
+
+    with open(file_path, 'w', encoding='utf-8') as out_file:
+        out_file.write(document)
+
+    return file_path
@@ -3,22 +3,63 @@
 from datetime import datetime
 from collections import defaultdict
 import os
-import time
-import matplotlib.pyplot as plt
+from io import BytesIO
+from typing import NamedTuple
 import numpy as np
 import pandas as pd
-from data.loaders import load_standings
-from data.transformers import gen_additional_data, get_team_record, get_remaining_fixtures, points_deductions
+from utils.utils import output_folder
+from data.transformers import gen_additional_data, get_remaining_fixtures
 from .logos import replace_xticks_with_logos
 from .threshold import ThresholdLine
 from .labels import format_title_and_axes_labels
-from .style import style_axes
+from .style import style_axes, FIXTURE_COLOURS
+from .export import save_png_banded, peak_rss_mb
+from .sprites import LabelSprites
+from .columns import TeamColumn, draw_team_column, draw_columns_parallel
+from .pipeline import StageTimer, start_render
+from .draft import DRAFT_DPI, CrestOverlay, draft_bbox, thumbnail
 
-pd.set_option('display.max_columns', None)
+
+class PreparedTable(NamedTuple):
+    """The loaded data with every team's record and column worked out, see prepare_table"""
+    # (teams, fixtures, team_crest) as load_standings returns them
+    data: tuple
+    # every team with the columns added by gen_additional_data, in table order
+    teams_all: pd.DataFrame
+    # team id: TeamColumn
+    columns: dict
+
+
+def prepare_table(data):
+    """
+    Work out every team's record and column from (teams, fixtures, team_crest), once.\n
+    The result can be passed to generate_table as 'prepared' for any lines, title and
+    positions, as long as the data hasn't changed since.
+    """
+    teams, df2, team_crest = data
+    teams_all, _ = gen_additional_data(teams.copy(), df2)
+
+    columns = {}
+    for team in teams_all.itertuples():
+        # record and points deductions were already worked out by gen_additional_data
+        points = team.points
+        goal_difference = "" if points <= 0 else f"GD {team.goal_difference:+d}"
+        games_played = "" if points <= 0 else f"MP {team.played}"
+
+        fixtures_remaining = get_remaining_fixtures(team.id, df2)
+        columns[team.id] = TeamColumn(
+            team.short_name, team.colours, points, goal_difference, games_played,
+            [(FIXTURE_COLOURS[fixture.opposition_difficulty], fixture.opposition_id,
+              fixture.location_date)
+             for fixture in fixtures_remaining.itertuples()]
+        )
+
+    return PreparedTable((teams, df2, team_crest), teams_all, columns)
 
 
 def generate_table(competition: str, lines_to_generate: list, title_text_1: str,
-                   file_text: str, pos_one=1, pos_two=20):
+                   file_text: str, pos_one=1, pos_two=20, band_mb=None, data=None,
+                   workers=None, draft=False, fig=None, as_bytes=False, prepared=None):
     """Function to generate the visualization of the table
 
     Keyword Arguments:
@@ -35,19 +76,35 @@ def generate_table(competition: str, lines_to_generate: list, title_text_1: str,
         pos_one -- the first position in the table to show on the image (default 1)
 
         pos_two -- the second position in the table to show on the image (default 20)
-    """
-    origin_time = time.time()
 
-    # convert competition code into correct data load
-    teams, df2, team_crest = load_standings(competition)
-    teams, teams_all = gen_additional_data(teams, df2)
+        band_mb -- if set, save the image in horizontal bands of at most this many MB,
+        so the full 300 DPI canvas is never held in memory (default None)
 
-    # convert table position to usable numbers
-    remove_from_top = pos_one - 1
-    remove_from_bottom = len(teams_all.index) - pos_two
+        data -- already loaded (teams, fixtures, team_crest) from load_standings,
+        to avoid loading them again (default None)
+
+        workers -- if set, draw the team columns in this many worker processes
+        and stitch them into the chart (default None, draw in this process). Only
+        worth it with many cores, as starting the workers and copying the strips back
+        costs more than it saves on one or two
+
+        draft -- render a quick preview at low DPI with crest thumbnails, saved over
+        '<file_text> draft.png' (default False)
+
+        fig -- a figure to clear and draw on, instead of creating a new one (default None)
 
-    teams.drop(teams.tail(remove_from_bottom).index, inplace=True)
-    teams.drop(teams.head(remove_from_top).index, inplace=True)
+        as_bytes -- return the PNG instead of saving it (default False)
+
+        prepared -- the data with every team's record and column already worked out
+        by prepare_table, used instead of 'data' (default None)
+
+    Returns the path of the saved image, or the PNG as bytes if as_bytes is set.\n
+    Safe to call repeatedly or from several threads: no pyplot or other global state is
+    used, and the figure is freed before returning unless it was passed in.
+    """
+    timer = StageTimer()
+    own_figure = fig is None
+    dpi = DRAFT_DPI if draft else 300
 
     # create the canvas and general constants
     starting_x = 18
@@ -86,87 +143,27 @@ def generate_table(competition: str, lines_to_generate: list, title_text_1: str,
     barwidth = 0.7
     theory_min = 114
 
-    fig, ax = plt.subplots(figsize=(starting_x, starting_y))
-
-    data_time = time.time()
+    # fetch the data, decode crests and set up the figure at the same time
+    if prepared is not None:
+        data = prepared.data
+    (teams, df2, team_crest), all_grey_crests, fig, ax = start_render(
+        competition, (starting_x, starting_y), timer, data, fig)
 
-    # Fixture Difficulty Colours
-    colours = {'1': '#68c47d',
-               '2': '#b5f7c6',
-               '3': '#e7e7e7',
-               '4': '#f5a1b2',
-               '5': '#f47272',
-               'TBC': '#a1a1a1',
-               'CAN': "#fdd663"
-               }
+    timer.begin('Gen data')
+    if prepared is None:
+        prepared = prepare_table((teams, df2, team_crest))
+    teams_all = prepared.teams_all.copy()
 
-    # loop for every team that needs a bar
-    for team in teams.itertuples():
-        points, max_pts, goal_difference, _goals_for, games_played = get_team_record(team.id, df2)
-        goal_difference = "" if points <= 0 else f"GD {goal_difference}"
-        games_played = "" if points <= 0 else f"MP {games_played}"
-
-        # Calculate points deductions
-        points, max_pts = points_deductions(team.id, points, max_pts)
+    # convert table position to usable numbers
+    teams = teams_all.iloc[pos_one - 1:pos_two].copy()
 
-        # update lowest theoretical points total if new teams is lower
-        theory_min = min(theory_min, points)
+    # gather every team's column first, so the layout is known before anything is drawn
+    columns = [prepared.columns[team_id] for team_id in teams['id']]
 
-        # create bar for current points, with team colour
-        team_current_bar = ax.bar(team.short_name, points,
-                                  color=team.colours, edgecolor=team.colours,
-                                  width=barwidth
-                                  )
-        top_prev = points
+    # update lowest theoretical points total if a shown team is lower
+    theory_min = min([theory_min] + [column.points for column in columns])
 
-        # loop for every remaining fixture for current team: row.id
-        fixtures_remaining = get_remaining_fixtures(team.id, df2)
-        for fixture in fixtures_remaining.itertuples():
-
-            difficulty_colour = colours[fixture.opposition_difficulty]
-            current_fixture = ax.bar(team.short_name, 3, bottom=top_prev,
-                                     color=difficulty_colour, edgecolor="#808080",
-                                     lw=1.5, width=barwidth
-                                     )[0]
-
-            # positioning of image and text in upcoming fixture bar
-            x,y = current_fixture.get_xy()
-            w, h = current_fixture.get_width(), current_fixture.get_height()
-
-            xleft = x + w/8.5
-            xright = x + w/1.121212
-            ybot = y + h/3.5
-            ytop = y + h/1.09
-
-            # plot the team logo and the fixture date
-            opp_crest_grey =  team_crest[fixture.opposition_id].convert('LA')
-            ax.imshow(opp_crest_grey, extent=[xleft, xright, ybot, ytop], aspect='auto', zorder=2)
-
-            ax.text(x+w/2, y+0.18, fixture.location_date,
-                        ha='center', fontname='sans-serif', c="#757171",
-                        weight='semibold', size='x-small')
-
-            # increment counter by 3, as each fixture has a possible value of 3 points
-            top_prev += 3
-
-        # remove bottom box outline
-        bar_a = team_current_bar[0]
-        x,y = bar_a.get_xy()
-        w, h = bar_a.get_width(), bar_a.get_height()
-        ax.bar(x+w/2, color=bar_a.get_facecolor(),
-                lw=1.5, height=h+0.01, edgecolor=team.colours, width=barwidth)
-
-        # goal difference label
-        gd_y = points-0.85 if points <2 else points-1
-        ax.text(x+w/2, gd_y, goal_difference,
-                ha='center', fontname='sans-serif', c='white',
-                weight='semibold', size='x-small')
-
-        # matches played label
-        mp_y = points-0.35 if points <2 else points-0.5
-        ax.text(x+w/2, mp_y, games_played,
-                ha='center', fontname='sans-serif', c='white',
-                weight='semibold', size='x-small')
+    timer.begin('Gen graph')
 
     # add_comp_logo(ax, comp_name, x, w, points, row.color)
 
@@ -212,6 +209,30 @@ def generate_table(competition: str, lines_to_generate: list, title_text_1: str,
     main_offset = x_offset[len(teams.index)]
     ax.margins(x=main_offset, tight=None)
 
+    # greyscale crests of every opponent, converted while the data was loading
+    grey_crests = {
+        opposition_id: (all_grey_crests[opposition_id] if opposition_id in all_grey_crests
+                        else team_crest[opposition_id].convert('LA'))
+        for opposition_id in {opp for column in columns for _c, opp, _l in column.fixtures}
+    }
+    if draft:
+        grey_crests = {opp: thumbnail(crest) for opp, crest in grey_crests.items()}
+
+    if workers:
+        draw_columns_parallel(ax, columns, grey_crests, barwidth,
+                              (min_lim, theory_max + 2), dpi=dpi, workers=workers)
+    else:
+        # fixture dates, GD and MP labels repeat a lot, so they are drawn as cached sprites
+        label_sprites = LabelSprites(ax)
+        # drafts paste every fixture crest into one image, rather than one image each
+        crests = CrestOverlay() if draft else None
+        for column in columns:
+            draw_team_column(ax, column.short_name, column, grey_crests, label_sprites, barwidth,
+                             crests)
+        if crests is not None:
+            crests.draw(ax)
+        ax.add_artist(label_sprites)
+
     title_pos = [pos_one, pos_two]
     y_labelsize = format_title_and_axes_labels(ax, title_text_1, title_pos, df2, teams, total_y)
 
@@ -261,27 +282,46 @@ def generate_table(competition: str, lines_to_generate: list, title_text_1: str,
 
     style_axes(ax, ax_width, y_labelsize)
 
-    replace_xticks_with_logos(ax, teams['id'].tolist(), team_crest, min_lim)
+    tick_ids = teams['id'].tolist()
+    if draft:
+        # same displayed size as the full size crests
+        zoom = 0.18 * team_crest[tick_ids[0]].width / thumbnail(team_crest[tick_ids[0]]).shape[1]
+        replace_xticks_with_logos(ax, tick_ids, {team_id: thumbnail(team_crest[team_id])
+                                                 for team_id in tick_ids}, min_lim, zoom)
+    else:
+        replace_xticks_with_logos(ax, tick_ids, team_crest, min_lim)
+
+    timer.begin('Save')
+
+    if as_bytes:
+        output = BytesIO()
+    else:
+        date_time = datetime.today().strftime('%d-%m-%y %H.%M')
+        title_name = f'{file_text} draft.png' if draft else f'{file_text} {date_time}.png'
+
+        base_folder = output_folder(competition)
 
-    graph_time = time.time()
+        os.makedirs(base_folder, exist_ok=True)
 
-    date_time = datetime.today().strftime('%d-%m-%y %H.%M')
-    title_name = f'{file_text} {date_time}.png'
+        output = os.path.join(base_folder, title_name)
 
-    if os.getenv("GITHUB_ACTIONS") == "true":
-        base_folder = os.path.join(os.getcwd(), "HistoryGenerated", competition)
+    if draft:
+        # the layout is known, so skip the extra draw savefig needs to find the tight bbox
+        bbox = draft_bbox(fig, ax, [line.text for line in obj_lst])
+        fig.savefig(output, bbox_inches=bbox, dpi=dpi, format='png')
+    elif band_mb:
+        save_png_banded(fig, output, dpi=dpi, pad_inches=0.25, band_mb=band_mb)
     else:
-        base_folder = os.path.join(os.getcwd(), "History", competition)
+        fig.savefig(output, bbox_inches='tight', pad_inches=0.25, dpi=dpi, format='png')
 
-    os.makedirs(base_folder, exist_ok=True)
+    # drop every artist, and with them the crest and label images they hold
+    if own_figure:
+        fig.clear()
 
-    file_path = os.path.join(base_folder, title_name)
+    print(f'Done. \n{timer.report()}'
+          f'\nPeak memory: {round(peak_rss_mb())} MB.')
 
-    plt.savefig(file_path, bbox_inches='tight', pad_inches=0.25, dpi=300)
-    print(f'Done. \nTime to gen data: {round(data_time - origin_time, 3)} sec.'
-          f'\nTime to gen graph: {round(graph_time - data_time, 3)} sec.'
-          f'\nTime to save: {round(time.time() - graph_time, 3)} sec.')
-    # plt.show()
+    return output.getvalue() if as_bytes else output
 
 if __name__ == "__main__":
     print("Please run the code in main.py to generate a graph")
@@ -1,10 +1,12 @@
 """Competition threshold line to display on graph"""
 
+from data.transformers import threshold_points
+
 class ThresholdLine():
     """Class representing a horizontal competition threshhold line"""
     def __init__(self, position, label, colour, teams, teams_all):
         self.position = position
-        self.pts_required = teams_all['max_points'][self.position]
+        self.pts_required = threshold_points(teams_all, self.position)
         self.label = label.replace('__', str(self.pts_required))
         self.colour = colour
         self.linestyle = (0, (5, 5))
@@ -0,0 +1,146 @@
+"""Build the crest manifest: primary colour and dimensions of every logo in Logos/*
+
+Run from the code folder:\n
+    python -m utils.crest_manifest [--force]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import sys
+import numpy as np
+from PIL import Image
+from data.loaders.crests import LOGO_DIR, MANIFEST_PATH, read_manifest
+from utils.image_metadata_update import premier_league_colours_25_26, championship_colours_25_26
+
+# hand-set colours always win over the extracted colour
+COLOUR_OVERRIDES = {
+    'PL': premier_league_colours_25_26,
+    'ELC': championship_colours_25_26,
+}
+
+QUANTIZE_LEVELS = 16
+
+# pixels less saturated or darker than these count as white, grey or black
+MIN_SATURATION = 0.3
+MIN_VALUE = 0.2
+# crests with fewer coloured pixels than this share are treated as black and white
+MIN_COLOURED_SHARE = 0.2
+
+# RGB distance beyond which an extracted colour is reported as far from its override
+OVERRIDE_WARNING_DISTANCE = 120
+THUMBNAIL_SIZE = (96, 96)
+
+
+def file_hash(path):
+    """sha256 of a file's contents, used to skip crests that have not changed"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def extract_primary_colour(path):
+    """
+    Find the dominant colour of a crest, ignoring transparent pixels and anything white,
+    grey or black by saturation and value (HSV). A crest with hardly any colour in it
+    uses its dark pixels instead.\n
+    Pixels are quantized into a 16x16x16 colour histogram, and the mean colour
+    of the most populated bin is returned as a hex string, along with the
+    full image dimensions.
+    """
+    with Image.open(path) as im:
+        width, height = im.size
+        im = im.convert('RGBA')
+        im.thumbnail(THUMBNAIL_SIZE)
+        pixels = np.asarray(im, dtype=np.uint8).reshape(-1, 4)
+
+    rgb = pixels[pixels[:, 3] >= 128, :3]
+    if len(rgb) == 0:
+        return None, width, height
+
+    # HSV saturation and value, 0 to 1
+    high = rgb.max(axis=1).astype(float)
+    low = rgb.min(axis=1).astype(float)
+    value = high / 255
+    saturation = np.divide(high - low, high, out=np.zeros_like(high), where=high > 0)
+
+    # white, grey and black backgrounds and outlines would make unreadable bars
+    coloured = (saturation >= MIN_SATURATION) & (value >= MIN_VALUE)
+    if coloured.sum() >= len(rgb) * MIN_COLOURED_SHARE:
+        rgb = rgb[coloured]
+    else:
+        # a black and white crest: use its dark parts
+        rgb = rgb[value < 0.5]
+        if len(rgb) == 0:
+            return None, width, height
+
+    quantized = (rgb // (256 // QUANTIZE_LEVELS)).astype(np.int32)
+    bins = (quantized[:, 0] * QUANTIZE_LEVELS + quantized[:, 1]) * QUANTIZE_LEVELS + quantized[:, 2]
+    dominant = np.bincount(bins, minlength=QUANTIZE_LEVELS ** 3).argmax()
+
+    r, g, b = rgb[bins == dominant].mean(axis=0).round().astype(int)
+    return f'#{r:02x}{g:02x}{b:02x}', width, height
+
+
+def colour_distance(colour_1, colour_2):
+    """Euclidean distance between two '#rrggbb' colours, 0 to ~441"""
+    rgb_1, rgb_2 = (np.array([int(colour[i:i + 2], 16) for i in (1, 3, 5)])
+                    for colour in (colour_1, colour_2))
+    return float(np.sqrt(((rgb_1 - rgb_2) ** 2).sum()))
+
+
+def _extract_entry(path):
+    colour, width, height = extract_primary_colour(path)
+    return {'sha256': file_hash(path), 'extracted': colour, 'width': width, 'height': height}
+
+
+def build_manifest(force=False):
+    """
+    Extract colours for every crest in Logos/*, in parallel, and write the manifest.\n
+    Crests whose content hash matches the existing manifest are not decoded again,
+    unless 'force' is set.
+    """
+    previous = {} if force else read_manifest()
+    manifest = {}
+    to_extract = []
+
+    for league_dir in sorted(p for p in LOGO_DIR.iterdir() if p.is_dir()):
+        league = league_dir.name
+        manifest[league] = {}
+        for path in sorted(league_dir.glob('*.png')):
+            old = previous.get(league, {}).get(path.stem)
+            if old is not None and old.get('sha256') == file_hash(path):
+                manifest[league][path.stem] = old
+            else:
+                to_extract.append((league, path))
+
+    with ProcessPoolExecutor() as pool:
+        entries = pool.map(_extract_entry, [path for _league, path in to_extract])
+        for (league, path), entry in zip(to_extract, entries):
+            manifest[league][path.stem] = entry
+
+    # extracted colours a new crest without an override would get very differently
+    far = []
+    for league, entries in manifest.items():
+        overrides = COLOUR_OVERRIDES.get(league, {})
+        for team_id, entry in entries.items():
+            override = overrides.get(int(team_id)) if team_id.isdigit() else None
+            entry['colour'] = override or entry['extracted']
+            entry['source'] = 'override' if override else 'extracted'
+            if override and (entry['extracted'] is None or colour_distance(
+                    override, entry['extracted']) > OVERRIDE_WARNING_DISTANCE):
+                far.append(f'  {league} {team_id}: extracted {entry["extracted"]}, '
+                           f'override {override}')
+
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        manifest_file.write('\n')
+
+    print(f'Extracted {len(to_extract)} crest(s), '
+          f'{sum(len(e) for e in manifest.values()) - len(to_extract)} unchanged. '
+          f'Written to {MANIFEST_PATH}')
+    if far:
+        print(f'{len(far)} extracted colour(s) far from the override:', *far, sep='\n')
+    return manifest
+
+
+if __name__ == "__main__":
+    build_manifest(force='--force' in sys.argv[1:])
@@ -1,5 +1,19 @@
 """Utils for module data processing"""
 
+import os
+from pathlib import Path
+
+# the repository root, so files are found and saved the same from any working directory
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def output_folder(competition):
+    """Folder to save generated files in, HistoryGenerated/ when running on GitHub Actions"""
+    if os.getenv("GITHUB_ACTIONS") == "true":
+        return os.path.join(ROOT_DIR, "HistoryGenerated", competition)
+    return os.path.join(ROOT_DIR, "History", competition)
+
+
 def get_current_gameweek(fixtures):
     """A function to calculate the current gameweek, for use in the title"""
     fixtures = fixtures.sort_values("kickoff_time").reset_index(drop=True)
@@ -0,0 +1,6 @@
+"""Make the modules under code/ importable, as PYTHONPATH=code does for the scripts"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
@@ -0,0 +1,86 @@
+"""Live mode against a recorded match day, with no network access"""
+
+import os
+import pandas as pd
+from data import live
+from data.transformers import gen_additional_data
+
+REPLAY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'match_day.jsonl')
+
+KICKOFF = pd.Timestamp('2025-05-03T14:00:00Z')
+
+
+def small_league():
+    """Four teams with eight results, two fixtures at KICKOFF and two a fortnight later"""
+    teams = pd.DataFrame({'id': [1, 2, 3, 4], 'short_name': ['AAA', 'BBB', 'CCC', 'DDD']})
+
+    results = [(1, 2, 2, 1), (3, 4, 0, 0), (1, 3, 1, 1), (2, 4, 3, 0),
+               (4, 1, 0, 2), (3, 2, 1, 2), (2, 1, 0, 0), (4, 3, 1, 0)]
+    upcoming = [(1, 4, KICKOFF), (2, 3, KICKOFF),
+                (4, 2, KICKOFF + pd.Timedelta(days=14)), (3, 1, KICKOFF + pd.Timedelta(days=14))]
+
+    rows = [{'team_h': home, 'team_a': away, 'team_h_score': home_score,
+             'team_a_score': away_score, 'status': 'FINISHED', 'started': True,
+             'finished': True, 'finished_provisional': True,
+             'kickoff_time': (KICKOFF - pd.Timedelta(days=7 * (8 - week))).isoformat(),
+             'event': week + 1}
+            for week, (home, away, home_score, away_score) in enumerate(results)]
+    rows += [{'team_h': home, 'team_a': away, 'team_h_score': None, 'team_a_score': None,
+              'status': 'SCHEDULED', 'started': False, 'finished': False,
+              'finished_provisional': False, 'kickoff_time': kickoff.isoformat(), 'event': 9}
+             for home, away, kickoff in upcoming]
+
+    df2 = pd.DataFrame(rows)
+    df2.insert(0, 'fixture_id', range(1, len(rows) + 1))
+    return teams, df2, {}
+
+
+def test_replay_renders_each_change_and_stops_after_full_time():
+    teams, df2, team_crest = small_league()
+    feed = live.ReplayFeed(REPLAY_PATH, start=KICKOFF - pd.Timedelta(hours=1))
+    renders = []
+
+    standings = live.run_live('PL', renders.append, 1, 4, feed=feed,
+                              data=(teams, df2, team_crest))
+
+    # start, kick off, two goals and full time; the empty first poll changes nothing
+    assert len(renders) == 5
+    assert feed.now() < KICKOFF + pd.Timedelta(hours=3)
+
+    scores = df2.set_index('fixture_id').loc[[9, 10], ['team_h_score', 'team_a_score', 'status']]
+    assert scores.values.tolist() == [[2, 0, 'FINISHED'], [1, 1, 'FINISHED']]
+
+    expected, _ = gen_additional_data(teams.copy(), df2)
+    assert standings['id'].tolist() == expected['id'].tolist()
+    assert standings['max_points'].tolist() == expected['max_points'].tolist()
+
+
+def test_fixture_never_reported_finished_stops_being_active():
+    _teams, df2, _team_crest = small_league()
+    df2.loc[df2['fixture_id'] == 9, ['status', 'started']] = ['IN_PLAY', True]
+
+    in_play = live.active_fixtures(df2, KICKOFF + pd.Timedelta(minutes=30))
+    assert in_play['fixture_id'].tolist() == [9, 10]
+
+    stale = live.active_fixtures(df2, KICKOFF + live.KICKOFF_GRACE + pd.Timedelta(minutes=1))
+    assert stale.empty
+
+
+def test_empty_poll_is_not_recorded(tmp_path):
+    record_path = tmp_path / 'record.jsonl'
+    feed = live.LiveFeed('PL', record_path=record_path)
+    feed.fetch_fixtures = lambda active: pd.json_normalize([])
+
+    _teams, df2, _team_crest = small_league()
+    updates = feed.fetch(df2.iloc[8:10])
+
+    assert updates.empty
+    assert live.apply_updates(df2, updates) == set()
+    assert not record_path.exists()
+
+
+def test_replay_of_empty_snapshot():
+    _teams, df2, _team_crest = small_league()
+    feed = live.ReplayFeed(REPLAY_PATH)
+
+    assert feed.fetch(df2.iloc[8:10]).empty
@@ -0,0 +1,114 @@
+"""SeasonState kept in step with a full recount by gen_additional_data"""
+
+import random
+import pandas as pd
+from data import live
+from data.season_state import SeasonState
+from data.transformers import gen_additional_data
+
+STANDINGS_COLUMNS = ['id', 'points', 'max_points', 'goal_difference', 'goals_for', 'played']
+
+START = pd.Timestamp('2025-08-16T14:00:00Z')
+
+
+def random_league(rnd, team_count=8, played_share=0.5):
+    """Double round robin with the first 'played_share' of fixtures finished"""
+    ids = rnd.sample(range(1, 100), team_count)
+    teams = pd.DataFrame({'id': ids, 'short_name': [f'T{team_id:02d}' for team_id in ids]})
+
+    pairs = [(home, away) for home in ids for away in ids if home != away]
+    rnd.shuffle(pairs)
+    played = int(len(pairs) * played_share)
+
+    df2 = pd.DataFrame({
+        'fixture_id': range(1, len(pairs) + 1),
+        'team_h': [home for home, _away in pairs],
+        'team_a': [away for _home, away in pairs],
+        'team_h_score': [rnd.randint(0, 4) if i < played else None for i in range(len(pairs))],
+        'team_a_score': [rnd.randint(0, 4) if i < played else None for i in range(len(pairs))],
+        'status': ['FINISHED' if i < played else 'SCHEDULED' for i in range(len(pairs))],
+        'kickoff_time': [(START + pd.Timedelta(days=3 * i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+                         for i in range(len(pairs))],
+    })
+    df2['started'] = df2['finished'] = df2['finished_provisional'] = df2['status'] == 'FINISHED'
+    return teams, df2, {}
+
+
+def random_update(rnd, state):
+    """One apply_result, reschedule or void on a random fixture"""
+    fixture_id = rnd.choice(list(state.fixture_row))
+    action = rnd.random()
+    if action < 0.6:
+        state.apply_result(fixture_id, rnd.randint(0, 4), rnd.randint(0, 4),
+                           status=rnd.choice(['FINISHED', 'IN_PLAY']))
+    elif action < 0.8:
+        if state.status[state.fixture_row[fixture_id]] != 'FINISHED':
+            state.reschedule(fixture_id, rnd.choice([None, '2026-05-24T15:00:00Z']))
+    else:
+        state.void(fixture_id)
+
+
+def assert_matches_recount(state):
+    expected, _ = gen_additional_data(state.teams.copy(), state.fixtures())
+    actual = state.standings()
+    for column in STANDINGS_COLUMNS:
+        assert actual[column].tolist() == expected[column].tolist(), column
+
+
+def test_updates_match_full_recount():
+    for seed in range(30):
+        rnd = random.Random(seed)
+        state = SeasonState.from_data('PL', random_league(rnd))
+        assert_matches_recount(state)
+
+        for update in range(60):
+            random_update(rnd, state)
+            if update % 10 == 9:
+                assert_matches_recount(state)
+
+
+def test_snapshot_round_trip(tmp_path):
+    rnd = random.Random(1)
+    state = SeasonState.from_data('PL', random_league(rnd))
+    for _update in range(40):
+        random_update(rnd, state)
+
+    path = tmp_path / 'state.json'
+    state.save(path)
+    restored = SeasonState.load(path)
+
+    assert restored.order == state.order
+    for column in STANDINGS_COLUMNS:
+        assert restored.standings()[column].tolist() == state.standings()[column].tolist()
+
+    # and it carries on from where it was saved
+    for _update in range(20):
+        random_update(rnd, restored)
+    assert_matches_recount(restored)
+
+
+def test_reschedule_and_void_clear_started_and_scores():
+    teams, df2, team_crest = random_league(random.Random(2), played_share=0)
+    state = SeasonState.from_data('PL', (teams, df2, team_crest))
+    kickoff = pd.Timestamp(df2['kickoff_time'].iloc[0])
+    home = state.team_row[df2['team_h'].iloc[0]]
+    max_points = state.max_points()[home]
+
+    state.apply_result(1, 3, 0, status='IN_PLAY')
+    assert state.points()[home] == 3 and state.totals['played'][home] == 1
+    state.reschedule(1, '2026-05-24T15:00:00Z')
+
+    # the abandoned result no longer counts, and the fixture is still to be played
+    assert state.points()[home] == 0 and state.totals['played'][home] == 0
+    assert state.max_points()[home] == max_points
+
+    state.apply_result(2, 0, 0, status='IN_PLAY')
+    state.void(2)
+    fixtures = state.fixtures().set_index('fixture_id')
+    assert not fixtures.loc[[1, 2], 'started'].any()
+    assert fixtures.loc[[1, 2], ['team_h_score', 'team_a_score']].isna().all(axis=None)
+    assert_matches_recount(state)
+
+    # neither is in play any more once their original kickoff is long gone
+    active = live.active_fixtures(state.fixtures(), kickoff + pd.Timedelta(days=1))
+    assert not active['fixture_id'].isin([1, 2]).any()